@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# The battery conversion is shared with the charging server in AGVCharging/project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project"))
+from battery_conversion import CHASSIS_TYPES, voltages_to_percentages
+
+POWER_MANAGEMENT_URL = "http://{ip}/data/powermanagement"
+POLL_INTERVAL = 2.0  # Seconds between the start of two sweeps
+CONNECT_TIMEOUT = 0.5  # Seconds until an unreachable Robotino is given up for this sweep
+READ_TIMEOUT = 2.0
+
+
+class PowerManagementPoller:
+    """
+    Polls the power management endpoint of all Robotinos concurrently.
+    Every Robotino gets its own keep-alive session, so the TCP connection is reused between sweeps,
+    and the requests of one sweep run in parallel, so a sweep takes about one round trip and an
+    unreachable Robotino only costs the connect timeout.
+    The latest combined battery snapshot is available as `snapshot` and passed to `on_snapshot`.
+    """
+
+    def __init__(self, robotinos, poll_interval=POLL_INTERVAL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, on_snapshot=None):
+        """
+        :param robotinos: list of {"ip": ..., "chassis_type": "model3" | "model4"}; the ip may include a port
+        :param poll_interval: seconds between the start of two sweeps when running continuously
+        :param on_snapshot: callable receiving every new snapshot (optional)
+        """
+        self.robotinos = list(robotinos)
+        self.poll_interval = poll_interval
+        self.timeout = (connect_timeout, read_timeout)
+        self.on_snapshot = on_snapshot
+        self.snapshot = None
+        self.sessions = {robot["ip"]: self._create_session() for robot in self.robotinos}
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.robotinos)),
+                                           thread_name_prefix="power-poller")
+        self.stop_event = threading.Event()
+
+    @staticmethod
+    def _create_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        session.mount("http://", adapter)
+        return session
+
+    def fetch(self, robot):
+        """
+        Fetches the power management data of one Robotino.
+        :return: parsed JSON data or None if the Robotino did not answer
+        """
+        url = POWER_MANAGEMENT_URL.format(ip=robot["ip"])
+        try:
+            response = self.sessions[robot["ip"]].get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                return response.json()
+            print(f"Failed to fetch data from {url}. HTTP Status Code: {response.status_code}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"An error occurred while connecting to {url}: {e}")
+        return None
+
+    def sweep(self):
+        """
+        Polls all Robotinos once and publishes the combined snapshot.
+        :return: {"timestamp": ..., "sweep_seconds": ..., "robots": {ip: {...}}}
+        """
+        started = time.monotonic()
+        results = list(self.executor.map(self.fetch, self.robotinos))
+
+        robots = {}
+        measured = []
+        for robot, data in zip(self.robotinos, results):
+            entry = {"chassis_type": robot["chassis_type"], "reachable": data is not None,
+                     "voltage": None, "percentage": None, "data": data}
+            if data and data.get("voltage") is not None:
+                entry["voltage"] = data["voltage"]
+                measured.append(robot["ip"])
+            robots[robot["ip"]] = entry
+
+        if measured:
+            percentages = voltages_to_percentages(
+                [robots[ip]["voltage"] for ip in measured],
+                [CHASSIS_TYPES.get(robots[ip]["chassis_type"], 4) for ip in measured]
+            )
+            for ip, percentage in zip(measured, percentages.tolist()):
+                robots[ip]["percentage"] = percentage
+
+        snapshot = {"timestamp": time.time(), "sweep_seconds": time.monotonic() - started, "robots": robots}
+        self.snapshot = snapshot
+        if self.on_snapshot:
+            self.on_snapshot(snapshot)
+        return snapshot
+
+    def run(self):
+        """
+        Sweeps continuously every poll_interval seconds until stop() is called.
+        """
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.sweep()
+            self.stop_event.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self.stop_event.set()
+
+    def close(self):
+        """
+        Stops polling and closes all pooled connections.
+        """
+        self.stop()
+        self.executor.shutdown(wait=True)
+        for session in self.sessions.values():
+            session.close()
@@ -0,0 +1,73 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubRobotinoServer:
+    """
+    Local HTTP server faking the /data/powermanagement endpoint of a Robotino.
+    Used to test the power management poller without the factory; every instance listens on its own port
+    and counts the connections it accepted and the requests it answered.
+    """
+
+    def __init__(self, voltage=22.0, delay=0.0, port=0, host="127.0.0.1"):
+        """
+        :param voltage: battery voltage around which the reported values fluctuate
+        :param delay: seconds the server waits before answering, to emulate a slow network
+        :param port: port to listen on, 0 picks a free port
+        """
+        self.voltage = voltage
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the Robotino web server
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                if self.path != "/data/powermanagement":
+                    self.send_error(404)
+                    return
+                with stub.lock:
+                    stub.requests += 1
+                time.sleep(stub.delay)
+                body = json.dumps(stub.power_management_data()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def power_management_data(self):
+        voltage = self.voltage + random.uniform(-0.05, 0.05)
+        return {"voltage": round(voltage, 3), "current": round(random.uniform(0.5, 2.5), 3),
+                "ext_power": False, "num_chargers": 0, "batteryLow": voltage < 19.5, "state": "discharging"}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
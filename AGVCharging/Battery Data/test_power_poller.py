@@ -0,0 +1,57 @@
+import pytest
+
+from power_poller import PowerManagementPoller
+from stub_robotino_server import StubRobotinoServer
+
+
+@pytest.fixture
+def start_stubs():
+    started = []
+
+    def start(count, **options):
+        stubs = [StubRobotinoServer(**options).start() for _ in range(count)]
+        started.extend(stubs)
+        return stubs
+
+    yield start
+    for stub in started:
+        stub.stop()
+
+
+def sweep(stubs, sweeps=1, **options):
+    """
+    Polls the stubs as model 3 Robotinos and returns the last snapshot.
+    """
+    poller = PowerManagementPoller([{"ip": stub.address, "chassis_type": "model3"} for stub in stubs], **options)
+    try:
+        for _ in range(sweeps):
+            snapshot = poller.sweep()
+    finally:
+        poller.close()
+    return snapshot
+
+
+def test_sweeps_reuse_one_connection_per_robotino(start_stubs):
+    stubs = start_stubs(3, voltage=22.0)
+    snapshot = sweep(stubs, sweeps=4)
+    assert all(robot["reachable"] for robot in snapshot["robots"].values())
+    assert [robot["percentage"] for robot in snapshot["robots"].values()] == [pytest.approx(50, abs=1)] * 3
+    assert [stub.requests for stub in stubs] == [4, 4, 4]
+    assert [stub.connections for stub in stubs] == [1, 1, 1]
+
+
+def test_robotinos_are_polled_concurrently(start_stubs):
+    stubs = start_stubs(6, delay=0.2)
+    snapshot = sweep(stubs)
+    assert all(robot["reachable"] for robot in snapshot["robots"].values())
+    assert snapshot["sweep_seconds"] < 0.2 * 3  # Sequential polling would take 6 * 0.2 s
+
+
+def test_slow_robotino_costs_only_the_read_timeout(start_stubs):
+    fast = start_stubs(1)[0]
+    slow = start_stubs(1, delay=2.0)[0]
+    snapshot = sweep([fast, slow], read_timeout=0.2)
+    assert snapshot["robots"][fast.address]["reachable"]
+    assert not snapshot["robots"][slow.address]["reachable"]
+    assert snapshot["robots"][slow.address]["percentage"] is None
+    assert snapshot["sweep_seconds"] < 1.0
@@ -1,131 +1,52 @@
-import heapq
-import random
 import time
+from collections import namedtuple
 from threading import Thread
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, Input, Output, State, Patch, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 
-# Classes
-class Robotino:
-    def __init__(self, robot_id, version, initial_status):
-        self.robot_id = robot_id
-        self.version = version
-        self.status = initial_status
-        self.battery_level = 100  # Start with a full battery
-
-    def __str__(self):
-        return f"Robotino-{self.robot_id} (Version {self.version}, {self.status}, Battery: {self.battery_level}%)"
-
-    def __lt__(self, other):
-        return self.battery_level < other.battery_level
-
-    def drain_battery(self, amount):
-        self.battery_level = max(0, self.battery_level - amount)
-
-    def recharge_battery(self):
-        """Increase the battery level by 20%, up to a maximum of 100%."""
-        if self.battery_level < 100:
-            self.battery_level = min(100, self.battery_level + 16)
-
-    def set_status(self, new_status):
-        self.status = new_status
-
-class Charger:
-    def __init__(self, charger_id, compatible_version):
-        self.charger_id = charger_id
-        self.compatible_version = compatible_version
-        self.current_robotino = None
-
-    def __str__(self):
-        status = "Available" if self.current_robotino is None else f"Charging {self.current_robotino}"
-        return f"Charger-{self.charger_id} (Compatible with Version {self.compatible_version}, {status})"
-
-    def connect(self, robotino):
-        if self.current_robotino is None and robotino.version == self.compatible_version:
-            self.current_robotino = robotino
-            robotino.set_status("charging")
-            return True
-        return False
-
-    def disconnect(self):
-        if self.current_robotino:
-            self.current_robotino = None
+from discrete_event_simulation import FactorySimulation
 
 # System Initialization
-operational_queue = []
-charging_queue = []
-chargers = [Charger(i + 1, compatible_version=4 if i == 0 else 3) for i in range(6)]
-
-robotinos = [Robotino(robot_id=i + 1, version=4 if i == 0 else 3,
-                      initial_status="operational" if i < 3 else "charging")
-             for i in range(6)]
-
-for robotino in robotinos[:3]:
-    heapq.heappush(operational_queue, robotino)
-for robotino in robotinos[3:]:
-    heapq.heappush(charging_queue, robotino)
-
-tasks = {i: f"Task-{i}" for i in range(1, 11)}
-robotino_tasks = {robotino.robot_id: None for robotino in robotinos}
-
-# Core Functions
-def assign_task(robotino):
-    for task_id, task in tasks.items():
-        if task:
-            robotino_tasks[robotino.robot_id] = task
-            tasks[task_id] = None
-            return
-
-def unassign_task(robotino):
-    task = robotino_tasks[robotino.robot_id]
-    if task:
-        for task_id, task_name in tasks.items():
-            if task_name is None:
-                tasks[task_id] = task
-                break
-        robotino_tasks[robotino.robot_id] = None
-
-def find_available_charger(robotino):
-    for charger in chargers:
-        if charger.compatible_version == robotino.version and charger.current_robotino is None:
-            return charger
-    return None
-
-def swap_robotinos():
-    """Simulates Robotino operation, battery drainage, and task swapping."""
-    drained_robotinos = []
-    for robotino in operational_queue:
-        robotino.drain_battery(random.randint(10, 12))  # Drain battery by a random amount
-        if robotino.battery_level < 10:  # Needs charging
-            drained_robotinos.append(robotino)
-
-    for low_battery_robotino in drained_robotinos:
-        unassign_task(low_battery_robotino)  # Unassign task before charging
-        operational_queue.remove(low_battery_robotino)
-        heapq.heapify(operational_queue)
-
-        charger = find_available_charger(low_battery_robotino)
-        if charger:
-            charger.connect(low_battery_robotino)
-            heapq.heappush(charging_queue, low_battery_robotino)
-        else:
-            heapq.heappush(operational_queue, low_battery_robotino)  # Stay operational if no charger
-
-    while len(operational_queue) < 3 and charging_queue:
-        ready_robotino = heapq.nlargest(1, charging_queue)[0]
-        charging_queue.remove(ready_robotino)
-        heapq.heapify(charging_queue)
-
-        for charger in chargers:
-            if charger.current_robotino == ready_robotino:
-                charger.disconnect()
-                break
-
-        ready_robotino.set_status("operational")
-        ready_robotino.drain_battery(5)  # Small initial drain
-        heapq.heappush(operational_queue, ready_robotino)
-        assign_task(ready_robotino)
+# The fleet is driven by the discrete-event simulation; its Robotino and Charger objects are shown here
+simulation = FactorySimulation(seed=0)
+robotinos = simulation.robotinos
+chargers = simulation.chargers
+robotino_tasks = simulation.robotino_tasks
+
+SIMULATED_SECONDS_PER_CYCLE = 15 * 60  # Simulated time between two displayed cycles
+DISPLAY_INTERVAL = 2  # Seconds of wall time between two displayed cycles, only to follow the dashboard
+SNAPSHOT_HISTORY = 50  # Published snapshots kept so the dashboard can diff a browser's version against them
+
+
+def queue_states():
+    """Returns the Robotinos in operation and the ones charging or on their way to a charger."""
+    operational_queue = [r for r in robotinos if r.status == "operational"]
+    charging_queue = [r for r in robotinos if r.status in ("charging", "traveling", "waiting")]
+    return operational_queue, charging_queue
+
+# Immutable view of the fleet, published by the simulation thread after every cycle.
+# The dashboard only reads the latest snapshot, never the live Robotino objects.
+DashboardSnapshot = namedtuple("DashboardSnapshot", ["version", "battery_levels", "tasks", "queue_lengths", "charger_occupants"])
+latest_snapshot = None
+snapshot_version = 0
+recent_snapshots = {}  # version -> DashboardSnapshot of the last SNAPSHOT_HISTORY versions
+
+def publish_snapshot():
+    """Publishes a new snapshot; replacing the module reference and single dict updates are atomic for the reader."""
+    global latest_snapshot, snapshot_version
+    snapshot_version += 1
+    operational_queue, charging_queue = queue_states()
+    latest_snapshot = DashboardSnapshot(
+        version=snapshot_version,
+        battery_levels=tuple(round(r.battery_level) for r in robotinos),
+        tasks=tuple(f"Task-{robotino_tasks[r.robot_id]}" if robotino_tasks[r.robot_id] else "None" for r in robotinos),
+        queue_lengths=(len(operational_queue), len(charging_queue)),
+        charger_occupants=tuple(c.current_robotino.robot_id if c.current_robotino else None for c in chargers)
+    )
+    recent_snapshots[snapshot_version] = latest_snapshot
+    recent_snapshots.pop(snapshot_version - SNAPSHOT_HISTORY, None)
 
 # Text Output Functions
 def display_battery_levels(robotinos):
@@ -146,34 +67,60 @@ def display_queue_states(operational_queue, charging_queue):
 def display_tasks(robotino_tasks):
     print("\nTask Assignments:")
     for robot_id, task in robotino_tasks.items():
-        task_display = task if task else "None"
+        task_display = f"Task-{task}" if task else "None"
         print(f"  Robotino-{robot_id}: {task_display}")
 
 # Simulation Logic
 def run_simulation():
-    for cycle in range(100):  # Simulate 30 cycles
+    for cycle in range(100):  # Simulate 100 cycles
         print(f"\nCycle {cycle + 1}:")
         print("=" * 100)
-        swap_robotinos()
-        for robotino in charging_queue:
-            robotino.recharge_battery()
+        simulation.run(until=simulation.now + SIMULATED_SECONDS_PER_CYCLE)
+        publish_snapshot()
 
         # Display text outputs
         display_battery_levels(robotinos)
         display_charger_status(chargers)
-        display_queue_states(operational_queue, charging_queue)
+        display_queue_states(*queue_states())
         display_tasks(robotino_tasks)
-        time.sleep(2)  # Wait for 2 seconds before next cycle
+        time.sleep(DISPLAY_INTERVAL)  # Pace the output so it can be followed on the dashboard
 
 # Run the simulation in a separate thread
+publish_snapshot()
 simulation_thread = Thread(target=run_simulation, daemon=True)
 simulation_thread.start()
 
 # Run the Dash Server
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
+def build_battery_figure(snapshot):
+    robot_ids = [f"R-{r.robot_id}" for r in robotinos]
+    return go.Figure(go.Bar(x=robot_ids, y=list(snapshot.battery_levels), marker_color="blue"))
+
+def build_task_table(snapshot):
+    return html.Table(children=[
+        html.Tr([html.Th("Robot"), html.Th("Task")]),
+        *[html.Tr([html.Td(f"R-{r.robot_id}"), html.Td(task)]) for r, task in zip(robotinos, snapshot.tasks)]
+    ], className="table table-hover")
+
+def build_queue_figure(snapshot):
+    return go.Figure(go.Bar(
+        x=["Operational Queue", "Charging Queue"],
+        y=list(snapshot.queue_lengths),
+        marker_color=["green", "purple"]
+    ))
+
+def build_charger_figure(snapshot):
+    charger_ids = [f"C-{c.charger_id}" for c in chargers]
+    occupied = [0 if occupant is None else 1 for occupant in snapshot.charger_occupants]
+    return go.Figure(go.Bar(x=charger_ids, y=occupied, marker_color="cyan"))
+
+def changed_indices(old, new):
+    return [i for i, (old_value, new_value) in enumerate(zip(old, new)) if old_value != new_value]
+
 app.layout = dbc.Container([
     dcc.Interval(id="interval-component", interval=5 * 1000, n_intervals=0),
+    dcc.Store(id="displayed-version"),  # Version of the snapshot currently shown in the browser
     dbc.Row(html.H1("Robotino Simulation Dashboard", className="text-center mb-4")),
     dbc.Row([
         dbc.Col(dcc.Graph(id="battery-levels"), width=6),
@@ -190,26 +137,51 @@ app.layout = dbc.Container([
     Output("task-assignments", "children"),
     Output("queue-states", "figure"),
     Output("charger-status", "figure"),
-    Input("interval-component", "n_intervals")
+    Output("displayed-version", "data"),
+    Input("interval-component", "n_intervals"),
+    State("displayed-version", "data")
 )
-def update_dashboard(n_intervals):
-    battery_levels = [r.battery_level for r in robotinos]
-    robot_ids = [f"R-{r.robot_id}" for r in robotinos]
-    battery_fig = go.Figure(go.Bar(x=robot_ids, y=battery_levels, marker_color="blue"))
-    task_display = html.Table(children=[
-        html.Tr([html.Th("Robot"), html.Th("Task")]),
-        *[html.Tr([html.Td(robot_ids[i]), html.Td(robotino_tasks.get(robotinos[i].robot_id, "None"))])
-          for i in range(len(robotinos))]
-    ], className="table table-hover")
-    queue_fig = go.Figure(go.Bar(
-        x=["Operational Queue", "Charging Queue"],
-        y=[len(operational_queue), len(charging_queue)],
-        marker_color=["green", "purple"]
-    ))
-    charger_status = [c.current_robotino.robot_id if c.current_robotino else "Empty" for c in chargers]
-    charger_ids = [f"C-{c.charger_id}" for c in chargers]
-    charger_fig = go.Figure(go.Bar(x=charger_ids, y=[1 if s != "Empty" else 0 for s in charger_status], marker_color="cyan"))
-    return battery_fig, task_display, queue_fig, charger_fig
+def update_dashboard(n_intervals, displayed_version):
+    """
+    Sends only the values that changed since the snapshot shown in the browser; the browser keeps just
+    the version of that snapshot, which is looked up in recent_snapshots.
+    The callback is skipped if no new snapshot was published; the figures are built completely
+    for the first update of a browser session and when its snapshot is no longer kept.
+    """
+    snapshot = latest_snapshot
+    if displayed_version == snapshot.version:
+        raise PreventUpdate
+    displayed = recent_snapshots.get(displayed_version)
+    if displayed is None:
+        return (build_battery_figure(snapshot), build_task_table(snapshot), build_queue_figure(snapshot),
+                build_charger_figure(snapshot), snapshot.version)
+
+    battery_patch = Patch()
+    battery_changes = changed_indices(displayed.battery_levels, snapshot.battery_levels)
+    for i in battery_changes:
+        battery_patch["data"][0]["y"][i] = snapshot.battery_levels[i]
+
+    task_patch = Patch()
+    task_changes = changed_indices(displayed.tasks, snapshot.tasks)
+    for i in task_changes:
+        # Row 0 of the table is the header; the second cell of every row holds the task
+        task_patch["props"]["children"][i + 1]["props"]["children"][1]["props"]["children"] = snapshot.tasks[i]
+
+    queue_patch = Patch()
+    queue_changes = changed_indices(displayed.queue_lengths, snapshot.queue_lengths)
+    for i in queue_changes:
+        queue_patch["data"][0]["y"][i] = snapshot.queue_lengths[i]
+
+    charger_patch = Patch()
+    charger_changes = changed_indices(displayed.charger_occupants, snapshot.charger_occupants)
+    for i in charger_changes:
+        charger_patch["data"][0]["y"][i] = 0 if snapshot.charger_occupants[i] is None else 1
+
+    return (battery_patch if battery_changes else no_update,
+            task_patch if task_changes else no_update,
+            queue_patch if queue_changes else no_update,
+            charger_patch if charger_changes else no_update,
+            snapshot.version)
 
 if __name__ == "__main__":
     print("Starting simulation. Visit the dashboard at http://127.0.0.1:8080/")
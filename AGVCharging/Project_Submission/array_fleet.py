@@ -0,0 +1,203 @@
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+
+# Status codes of the status column
+OPERATIONAL = 0
+STANDBY = 1
+TRAVELING = 2
+WAITING = 3
+CHARGING = 4
+STATUS_NAMES = {OPERATIONAL: "operational", STANDBY: "standby", TRAVELING: "traveling",
+                WAITING: "waiting", CHARGING: "charging"}
+
+NO_ASSIGNMENT = -1
+TICK_SECONDS = 10.0
+DRAIN_RATE = (30.0, 36.0)  # Battery drain in percent per hour while working
+CHARGE_RATE = 60.0  # Battery charge in percent per hour
+TRAVEL_TIME = (30.0, 120.0)  # Seconds to drive to a charger
+CHARGE_THRESHOLD = 10
+OPERATIONAL_SHARE = 0.5
+
+
+class ArrayFleet:
+    """
+    Struct-of-arrays model of a large Robotino fleet for the time-stepped simulator.
+    Every attribute is a NumPy column indexed by robot (battery, version, status, assigned charger
+    and task, travel timer), so per-tick drain and recharge are single vectorized operations.
+    Free chargers are kept in free-lists per compatible version and free tasks in a deque,
+    so assignments never scan the fleet.
+    """
+
+    def __init__(self, robot_versions, charger_versions, task_count, seed=0,
+                 drain_rate=DRAIN_RATE, charge_rate=CHARGE_RATE, travel_time=TRAVEL_TIME):
+        self.rng = np.random.default_rng(seed)
+        robot_count = len(robot_versions)
+        self.battery = np.full(robot_count, 100.0)
+        self.version = np.asarray(robot_versions, dtype=np.int8)
+        self.status = np.full(robot_count, STANDBY, dtype=np.int8)
+        self.charger = np.full(robot_count, NO_ASSIGNMENT, dtype=np.int32)
+        self.task = np.full(robot_count, NO_ASSIGNMENT, dtype=np.int32)
+        self.travel_remaining = np.zeros(robot_count)
+        self.drain_rate = self.rng.uniform(*drain_rate, size=robot_count)  # Per robot, percent per hour
+        self.charge_rate = charge_rate
+        self.travel_time = travel_time
+
+        self.charger_version = np.asarray(charger_versions, dtype=np.int8)
+        self.free_chargers = {int(version): deque() for version in np.unique(self.charger_version)}
+        for charger_id, version in enumerate(self.charger_version.tolist()):
+            self.free_chargers[version].append(charger_id)
+        self.waiting = {int(version): deque() for version in np.unique(self.version)}
+        self.free_tasks = deque(range(task_count))
+
+    def __len__(self):
+        return len(self.battery)
+
+    def status_counts(self):
+        counts = np.bincount(self.status, minlength=len(STATUS_NAMES))
+        return {name: int(counts[code]) for code, name in STATUS_NAMES.items()}
+
+    def start_work(self, robot):
+        """
+        Puts a Robotino into operation with the next free task; returns False if no task is free.
+        """
+        if not self.free_tasks:
+            return False
+        self.task[robot] = self.free_tasks.popleft()
+        self.status[robot] = OPERATIONAL
+        return True
+
+    def stop_work(self, robot):
+        self.free_tasks.appendleft(int(self.task[robot]))
+        self.task[robot] = NO_ASSIGNMENT
+
+    def request_charger(self, robot):
+        """
+        Sends the Robotino to a free compatible charger or lets it wait for one.
+        """
+        free = self.free_chargers.get(int(self.version[robot]))
+        if free:
+            self.charger[robot] = free.popleft()
+            self.status[robot] = TRAVELING
+            self.travel_remaining[robot] = self.rng.uniform(*self.travel_time)
+        else:
+            self.status[robot] = WAITING
+            self.waiting[int(self.version[robot])].append(robot)
+
+    def release_charger(self, robot):
+        """
+        Frees the charger of the Robotino and hands it to the longest waiting compatible Robotino.
+        """
+        charger_id = int(self.charger[robot])
+        self.charger[robot] = NO_ASSIGNMENT
+        version = int(self.charger_version[charger_id])
+        self.free_chargers[version].append(charger_id)
+        if self.waiting.get(version):
+            self.request_charger(self.waiting[version].popleft())
+
+
+class ArrayFleetSimulation:
+    """
+    Time-stepped simulation on an ArrayFleet: drain, travel and recharge are vectorized per tick,
+    only Robotinos that change their status in a tick are handled one by one.
+    """
+
+    def __init__(self, fleet, operational_slots, charge_threshold=CHARGE_THRESHOLD, tick_seconds=TICK_SECONDS):
+        self.fleet = fleet
+        self.operational_slots = operational_slots
+        self.charge_threshold = charge_threshold
+        self.tick_seconds = tick_seconds
+        self.now = 0.0
+        self.statistics = {"charge_requests": 0, "brownouts": 0, "operational_seconds": 0.0,
+                           "charging_seconds": 0.0, "waiting_seconds": 0.0}
+        self._fill_slots()
+
+    def _fill_slots(self):
+        fleet = self.fleet
+        missing = self.operational_slots - int(np.count_nonzero(fleet.status == OPERATIONAL))
+        if missing <= 0:
+            return
+        standby = np.flatnonzero(fleet.status == STANDBY)
+        # Most charged standby Robotinos first
+        for robot in standby[np.argsort(-fleet.battery[standby], kind="stable")][:missing].tolist():
+            if not fleet.start_work(robot):
+                break
+
+    def tick(self):
+        fleet = self.fleet
+        hours = self.tick_seconds / 3600
+        operational = fleet.status == OPERATIONAL
+        traveling = fleet.status == TRAVELING
+        charging = fleet.status == CHARGING
+
+        # Vectorized drain, travel and recharge
+        fleet.battery -= np.where(operational | traveling, fleet.drain_rate * hours, 0.0)
+        brownouts = (fleet.battery <= 0) & (operational | traveling)
+        self.statistics["brownouts"] += int(np.count_nonzero(brownouts))
+        np.maximum(fleet.battery, 0.0, out=fleet.battery)
+        fleet.battery[charging] = np.minimum(100.0, fleet.battery[charging] + fleet.charge_rate * hours)
+        fleet.travel_remaining[traveling] -= self.tick_seconds
+
+        self.statistics["operational_seconds"] += np.count_nonzero(operational) * self.tick_seconds
+        self.statistics["charging_seconds"] += np.count_nonzero(charging) * self.tick_seconds
+        self.statistics["waiting_seconds"] += np.count_nonzero(fleet.status == WAITING) * self.tick_seconds
+
+        # Only Robotinos changing their status are handled individually
+        for robot in np.flatnonzero(operational & (fleet.battery < self.charge_threshold)).tolist():
+            fleet.stop_work(robot)
+            self.statistics["charge_requests"] += 1
+            fleet.request_charger(robot)
+        for robot in np.flatnonzero(traveling & (fleet.travel_remaining <= 0)).tolist():
+            fleet.status[robot] = CHARGING
+        for robot in np.flatnonzero(charging & (fleet.battery >= 100.0)).tolist():
+            fleet.status[robot] = STANDBY
+            fleet.release_charger(robot)
+
+        self._fill_slots()
+        self.now += self.tick_seconds
+
+    def run(self, until):
+        """
+        Simulates up to the simulated time `until` (seconds) and returns the statistics.
+        """
+        while self.now < until:
+            self.tick()
+        return self.results()
+
+    def results(self):
+        results = dict(self.statistics)
+        results["simulated_seconds"] = self.now
+        if self.now > 0:
+            results["availability"] = self.statistics["operational_seconds"] / (self.operational_slots * self.now)
+            results["charger_utilization"] = (self.statistics["charging_seconds"]
+                                              / (len(self.fleet.charger_version) * self.now))
+        return results
+
+
+def main():
+    """
+    Simulates a large fleet and prints the statistics and the wall time needed.
+    """
+    parser = argparse.ArgumentParser(description="Time-stepped simulation of a large Robotino fleet")
+    parser.add_argument("--robots", type=int, default=10000)
+    parser.add_argument("--chargers", type=int, default=3000)
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    robot_versions = [4 if i % 6 == 0 else 3 for i in range(args.robots)]
+    charger_versions = [4 if i % 6 == 0 else 3 for i in range(args.chargers)]
+    fleet = ArrayFleet(robot_versions, charger_versions, task_count=args.robots, seed=args.seed)
+    simulation = ArrayFleetSimulation(fleet, operational_slots=round(args.robots * OPERATIONAL_SHARE))
+
+    started = time.perf_counter()
+    results = simulation.run(until=args.days * 24 * 60 * 60)
+    for key, value in results.items():
+        print(f"{key}: {value}")
+    print(f"wall time: {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
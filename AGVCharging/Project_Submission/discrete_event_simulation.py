@@ -0,0 +1,377 @@
+import argparse
+import heapq
+import itertools
+import os
+import random
+import sys
+from collections import deque
+
+from simulation_models import Charger, Robotino
+
+# The indexed priority queue is shared with the charging server in AGVCharging/project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project"))
+from charging_policies import POLICIES, ChargerView, ChargingPolicy, FleetSnapshot, RobotView, create_policy
+from indexed_priority_queue import IndexedPriorityQueue
+
+# Event types
+TASK_COMPLETE = "task_complete"
+BATTERY_LOW = "battery_low"
+TRAVEL_ARRIVAL = "travel_arrival"
+CHARGE_COMPLETE = "charge_complete"
+BROWNOUT = "brownout"  # A waiting Robotino ran empty before it got a charger
+PLAN = "plan"  # Periodic run of the charging policy, not bound to a Robotino
+
+# Default fleet: 6 Robotinos and 6 chargers, the first of each is version 4
+DEFAULT_ROBOT_VERSIONS = [4, 3, 3, 3, 3, 3]
+DEFAULT_CHARGER_VERSIONS = [4, 3, 3, 3, 3, 3]
+OPERATIONAL_SLOTS = 3  # Robotinos needed in operation at the same time
+TASK_COUNT = 10
+TASK_DURATION = 300.0  # Mean task duration in seconds
+DRAIN_RATE = (30.0, 36.0)  # Battery drain in percent per hour while working, drawn per task
+IDLE_DRAIN_RATE = 5.0  # Battery drain in percent per hour while waiting for a charger
+CHARGE_RATE = 60.0  # Battery charge in percent per hour
+TRAVEL_TIME = (30.0, 120.0)  # Seconds to drive to a charger
+CHARGE_THRESHOLD = 10  # Robotinos below this battery level leave operation to charge
+RESUME_THRESHOLD = 50  # Charging Robotinos above this level may be taken back into operation
+PLAN_INTERVAL = 5 * 60  # Seconds between two periodic runs of the charging policy
+
+
+class EventQueue:
+    """
+    Heap of scheduled events ordered by time; events at the same time keep their scheduling order.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.sequence = itertools.count()
+
+    def push(self, time, kind, robot_id, token):
+        heapq.heappush(self.heap, (time, next(self.sequence), kind, robot_id, token))
+
+    def pop(self):
+        time, _, kind, robot_id, token = heapq.heappop(self.heap)
+        return time, kind, robot_id, token
+
+    def next_time(self):
+        return self.heap[0][0] if self.heap else None
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class FactorySimulation:
+    """
+    Discrete-event simulation of the Robotino fleet and its chargers.
+    Task completion, low battery, arrival at a charger, charge completion and the brown-out of a Robotino
+    waiting too long for a charger are scheduled events on a simulated clock, so the simulation runs as fast as the events can be processed.
+    All randomness comes from seeded streams (tasks, drain, travel), so the same seed always
+    gives the same results.
+    """
+
+    def __init__(self, robot_versions=DEFAULT_ROBOT_VERSIONS, charger_versions=DEFAULT_CHARGER_VERSIONS,
+                 operational_slots=OPERATIONAL_SLOTS, task_count=TASK_COUNT, seed=0,
+                 task_duration=TASK_DURATION, drain_rate=DRAIN_RATE, charge_rate=CHARGE_RATE,
+                 travel_time=TRAVEL_TIME, charge_threshold=CHARGE_THRESHOLD, resume_threshold=RESUME_THRESHOLD,
+                 policy="threshold", plan_interval=PLAN_INTERVAL, idle_drain_rate=IDLE_DRAIN_RATE):
+        """
+        :param policy: ChargingPolicy instance, or the name of a registered policy (see charging_policies),
+                       which is then created with the charge threshold, resume threshold and charge rate
+        :param plan_interval: seconds between two runs of the policy that are not triggered by an event
+        :param idle_drain_rate: battery drain in percent per hour of a Robotino waiting for a charger
+        """
+        if not isinstance(policy, ChargingPolicy):
+            policy = create_policy(policy, threshold=charge_threshold, release_level=resume_threshold,
+                                   charge_rate=charge_rate)
+        self.robotinos = [Robotino(robot_id=i + 1, version=version, initial_status="standby")
+                          for i, version in enumerate(robot_versions)]
+        self.chargers = [Charger(i + 1, compatible_version=version) for i, version in enumerate(charger_versions)]
+        self.robots_by_id = {robotino.robot_id: robotino for robotino in self.robotinos}
+        self.chargers_by_id = {charger.charger_id: charger for charger in self.chargers}
+        self.operational_slots = operational_slots
+        self.task_duration = task_duration
+        self.drain_rate = drain_rate
+        self.idle_drain_rate = idle_drain_rate
+        self.charge_rate = charge_rate
+        self.travel_time = travel_time
+        self.policy = policy
+        self.plan_interval = plan_interval
+
+        self.rngs = {name: random.Random(f"{seed}:{name}") for name in ("task", "drain", "travel")}
+        self.events = EventQueue()
+        self.now = 0.0
+
+        self.free_tasks = deque(range(1, task_count + 1))
+        self.robotino_tasks = {robotino.robot_id: None for robotino in self.robotinos}
+        self.tokens = {robotino.robot_id: 0 for robotino in self.robotinos}  # Invalidates stale events
+        self.work_started = {}  # robot ID -> (start time, drain rate) of the current task, travel or wait
+        self.charge_started = {}  # robot ID -> (start time, battery level at start)
+        self.reservations = {}  # charger ID -> Robotino driving to or charging at the charger
+        self.robot_chargers = {}  # robot ID -> Charger
+        # Most charged first
+        self.standby_queue = IndexedPriorityQueue(((r.robot_id, r.battery_level) for r in self.robotinos
+                                                   if r.status == "standby"), reverse=True)
+
+        self.status_counts = {}
+        for robotino in self.robotinos:
+            self.status_counts[robotino.status] = self.status_counts.get(robotino.status, 0) + 1
+        self.statistics = {"tasks_completed": 0, "charge_requests": 0, "early_charges": 0, "brownouts": 0,
+                           "operational_seconds": 0.0, "charging_seconds": 0.0,
+                           "standby_seconds": 0.0, "waiting_seconds": 0.0}
+        self._fill_slots()
+        self.events.push(self.plan_interval, PLAN, None, None)
+
+    # Bookkeeping
+    def _set_status(self, robotino, status):
+        self.status_counts[robotino.status] -= 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.standby_queue.discard(robotino.robot_id)
+        if status == "standby":
+            self.standby_queue.push(robotino.robot_id, robotino.battery_level)
+        robotino.set_status(status)
+
+    def _advance(self, time):
+        elapsed = time - self.now
+        if elapsed > 0:
+            for status in ("operational", "charging", "standby", "waiting"):
+                self.statistics[f"{status}_seconds"] += self.status_counts.get(status, 0) * elapsed
+        self.now = time
+
+    def _schedule(self, delay, kind, robotino):
+        self.events.push(self.now + delay, kind, robotino.robot_id, self.tokens[robotino.robot_id])
+
+    # Work
+    def _start_task(self, robotino):
+        if not self.free_tasks:
+            self._set_status(robotino, "standby")
+            return
+        task_id = self.free_tasks.popleft()
+        self.robotino_tasks[robotino.robot_id] = task_id
+        self._set_status(robotino, "operational")
+
+        duration = self.rngs["task"].expovariate(1 / self.task_duration)
+        rate = self.rngs["drain"].uniform(*self.drain_rate)
+        self.work_started[robotino.robot_id] = (self.now, rate)
+        time_to_low = max(0.0, robotino.battery_level - self.policy.threshold) / rate * 3600
+        if duration < time_to_low:
+            self._schedule(duration, TASK_COMPLETE, robotino)
+        else:
+            self._schedule(time_to_low, BATTERY_LOW, robotino)
+
+    def _stop_work(self, robotino, task_finished):
+        started, rate = self.work_started.pop(robotino.robot_id)
+        robotino.drain_battery(rate * (self.now - started) / 3600)
+        task_id = self.robotino_tasks[robotino.robot_id]
+        self.robotino_tasks[robotino.robot_id] = None
+        if task_finished:
+            self.free_tasks.append(task_id)
+        else:
+            self.free_tasks.appendleft(task_id)  # Unfinished tasks are picked up first
+
+    def open_slots(self):
+        """
+        Number of operational slots that could start a task now.
+        """
+        return min(self.operational_slots - self.status_counts.get("operational", 0), len(self.free_tasks))
+
+    def _fill_slots(self):
+        """
+        Brings standby Robotinos into operation, most charged first, until all operational slots are filled.
+        Charging Robotinos are taken back into operation when the policy releases them.
+        """
+        while self.open_slots() > 0 and self.standby_queue:
+            self._start_task(self.robots_by_id[self.standby_queue.peek()[0]])
+
+    # Charging
+    def charge_level(self, robotino):
+        """
+        Returns the battery level of a Robotino at the current simulated time, including charge in progress.
+        """
+        if robotino.status != "charging":
+            return robotino.battery_level
+        started, level = self.charge_started[robotino.robot_id]
+        return min(100.0, level + self.charge_rate * (self.now - started) / 3600)
+
+    def battery_now(self, robotino):
+        """
+        Returns the battery level of a Robotino at the current simulated time, including charge or drain in progress.
+        """
+        if robotino.robot_id in self.work_started:  # Working, traveling or waiting
+            started, rate = self.work_started[robotino.robot_id]
+            return robotino.battery_level - rate * (self.now - started) / 3600
+        return self.charge_level(robotino)
+
+    def snapshot(self):
+        """
+        Immutable view of the fleet for the charging policy. The simulation has no floor positions,
+        so all Robotinos and chargers are placed at the origin.
+        """
+        robots = []
+        for robotino in self.robotinos:
+            drain_rate = self.work_started[robotino.robot_id][1] if robotino.status == "operational" else None
+            robots.append(RobotView(robotino.robot_id, robotino.version, 0.0, 0.0, self.battery_now(robotino),
+                                    robotino.status, drain_rate, None))
+        chargers = []
+        for charger in self.chargers:
+            occupant = self.reservations.get(charger.charger_id)
+            if occupant is None:
+                chargers.append(ChargerView(charger.charger_id, charger.compatible_version, 0.0, 0.0, None, 0.0))
+            else:
+                free_in = (100 - self.battery_now(occupant)) / self.charge_rate * 3600
+                chargers.append(ChargerView(charger.charger_id, charger.compatible_version, 0.0, 0.0,
+                                            occupant.robot_id, free_in))
+        return FleetSnapshot(self.now, tuple(robots), tuple(chargers), self.open_slots())
+
+    def _apply_policy(self):
+        """
+        Asks the charging policy for decisions and carries them out until it has none left:
+        released Robotinos stop charging and go to standby, dispatched Robotinos drive to their charger.
+        Working Robotinos dispatched by the policy stop their task first (early charging).
+        """
+        while True:
+            self._fill_slots()
+            decisions = self.policy.decide(self.snapshot())
+            if not decisions.dispatch and not decisions.release:
+                return
+            for robot_id in decisions.release:
+                robotino = self.robots_by_id[robot_id]
+                self._interrupt_charging(robotino)
+                self._set_status(robotino, "standby")
+            for robot_id, charger_id in decisions.dispatch:
+                robotino = self.robots_by_id[robot_id]
+                if robotino.status == "operational":
+                    self.tokens[robot_id] += 1  # The scheduled task completion or low battery is stale now
+                    self._stop_work(robotino, task_finished=False)
+                    self.statistics["charge_requests"] += 1
+                    self.statistics["early_charges"] += 1
+                self._travel_to(robotino, self.chargers_by_id[charger_id])
+
+    def _travel_to(self, robotino, charger):
+        if robotino.robot_id in self.work_started:  # Waited for the charger
+            self.tokens[robotino.robot_id] += 1  # The scheduled brown-out is stale now
+            self._stop_waiting(robotino)
+        self.reservations[charger.charger_id] = robotino
+        self.robot_chargers[robotino.robot_id] = charger
+        self._set_status(robotino, "traveling")
+        duration = self.rngs["travel"].uniform(*self.travel_time)
+        self.work_started[robotino.robot_id] = (self.now, self.drain_rate[0])
+        self._schedule(duration, TRAVEL_ARRIVAL, robotino)
+
+    def _wait_for_charger(self, robotino):
+        """
+        Parks a Robotino that needs charging until the policy dispatches it; it drains at the idle rate
+        meanwhile and browns out if it runs empty first.
+        """
+        self._set_status(robotino, "waiting")
+        if self.idle_drain_rate > 0 and robotino.battery_level > 0:
+            self.work_started[robotino.robot_id] = (self.now, self.idle_drain_rate)
+            self._schedule(robotino.battery_level / self.idle_drain_rate * 3600, BROWNOUT, robotino)
+
+    def _stop_waiting(self, robotino):
+        started, rate = self.work_started.pop(robotino.robot_id)
+        robotino.drain_battery(rate * (self.now - started) / 3600)
+
+    def _release_charger(self, robotino):
+        charger = self.robot_chargers.pop(robotino.robot_id)
+        charger.disconnect()
+        del self.reservations[charger.charger_id]
+
+    def _interrupt_charging(self, robotino):
+        robotino.battery_level = self.charge_level(robotino)
+        del self.charge_started[robotino.robot_id]
+        self.tokens[robotino.robot_id] += 1  # The scheduled charge completion is stale now
+        self._release_charger(robotino)
+
+    # Event handlers
+    def _on_task_complete(self, robotino):
+        self._stop_work(robotino, task_finished=True)
+        self.statistics["tasks_completed"] += 1
+        self._start_task(robotino)
+
+    def _on_battery_low(self, robotino):
+        self._stop_work(robotino, task_finished=False)
+        robotino.battery_level = min(robotino.battery_level, self.policy.threshold)  # Rounding of the drain
+        self.statistics["charge_requests"] += 1
+        self._wait_for_charger(robotino)
+        self._apply_policy()
+
+    def _on_brownout(self, robotino):
+        self._stop_waiting(robotino)
+        robotino.battery_level = 0
+        self.statistics["brownouts"] += 1
+
+    def _on_travel_arrival(self, robotino):
+        level = robotino.battery_level
+        started, rate = self.work_started.pop(robotino.robot_id)
+        robotino.drain_battery(rate * (self.now - started) / 3600)
+        if level > 0 >= robotino.battery_level:  # Robotinos that browned out while waiting are counted once
+            self.statistics["brownouts"] += 1
+        charger = self.robot_chargers[robotino.robot_id]
+        self._set_status(robotino, "charging")
+        charger.connect(robotino)
+        self.charge_started[robotino.robot_id] = (self.now, robotino.battery_level)
+        self._schedule((100 - robotino.battery_level) / self.charge_rate * 3600, CHARGE_COMPLETE, robotino)
+
+    def _on_plan(self):
+        """
+        Periodic run of the charging policy, e.g. for early charging decisions of a predictive policy.
+        """
+        self._apply_policy()
+        self.events.push(self.now + self.plan_interval, PLAN, None, None)
+
+    def _on_charge_complete(self, robotino):
+        robotino.battery_level = 100
+        del self.charge_started[robotino.robot_id]
+        self._release_charger(robotino)
+        self._set_status(robotino, "standby")
+        self._apply_policy()
+
+    def run(self, until):
+        """
+        Processes all events up to the simulated time `until` (seconds).
+        :return: the statistics collected so far
+        """
+        handlers = {TASK_COMPLETE: self._on_task_complete, BATTERY_LOW: self._on_battery_low,
+                    TRAVEL_ARRIVAL: self._on_travel_arrival, CHARGE_COMPLETE: self._on_charge_complete,
+                    BROWNOUT: self._on_brownout}
+        while self.events and self.events.next_time() <= until:
+            time, kind, robot_id, token = self.events.pop()
+            if kind == PLAN:
+                self._advance(time)
+                self._on_plan()
+                continue
+            if token != self.tokens[robot_id]:
+                continue
+            self._advance(time)
+            handlers[kind](self.robots_by_id[robot_id])
+        self._advance(until)
+        return self.results()
+
+    def results(self):
+        """
+        Returns the statistics together with the derived fleet availability and charger utilization.
+        """
+        results = dict(self.statistics)
+        results["simulated_seconds"] = self.now
+        if self.now > 0:
+            results["availability"] = self.statistics["operational_seconds"] / (self.operational_slots * self.now)
+            results["charger_utilization"] = self.statistics["charging_seconds"] / (len(self.chargers) * self.now)
+        return results
+
+
+def main():
+    """
+    Runs the simulation headless and prints the collected statistics.
+    """
+    parser = argparse.ArgumentParser(description="Discrete-event simulation of the Robotino charging system")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="threshold")
+    args = parser.parse_args()
+
+    simulation = FactorySimulation(seed=args.seed, policy=args.policy)
+    for key, value in simulation.run(until=args.days * 24 * 60 * 60).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from discrete_event_simulation import FactorySimulation
+
+# Charging policies as parameter sets of the simulation
+POLICY_PARAMETERS = {
+    "reactive-10": {"charge_threshold": 10, "resume_threshold": 50},
+    "reactive-20": {"charge_threshold": 20, "resume_threshold": 50},
+    "full-charge": {"charge_threshold": 10, "resume_threshold": 101},  # Never interrupt charging
+    "predictive-10": {"charge_threshold": 10, "resume_threshold": 50, "policy": "predictive"},
+}
+
+# Share of version 4 Robotinos and chargers per layout
+LAYOUTS = {
+    "mixed": 1 / 6,
+    "v3-only": 0.0,
+    "half-v4": 0.5,
+}
+
+DEFAULT_GRID = {
+    "fleet_size": [6, 12, 24],
+    "charger_count": [2, 4, 6],
+    "layout": ["mixed"],
+    "drain_rate": [(30.0, 36.0)],
+    "charge_rate": [60.0],
+    "policy": list(POLICY_PARAMETERS),
+    "operational_share": [0.5],  # Share of the fleet needed in operation at the same time
+}
+SIMULATED_DAYS = 7
+
+RESULT_COLUMNS = ["throughput_per_hour", "availability", "robot_idle_share", "charger_utilization", "brownouts"]
+
+
+def versions_for(count, layout):
+    """
+    Returns the Robotino or charger versions for a layout; the version 4 units come first.
+    """
+    version_4_count = round(count * LAYOUTS[layout])
+    if LAYOUTS[layout] > 0:
+        version_4_count = max(1, version_4_count)
+    return [4] * version_4_count + [3] * (count - version_4_count)
+
+
+def run_replication(job):
+    """
+    Runs one seeded replication of a scenario (executed in a worker process).
+    :param job: (scenario dictionary, seed, simulated seconds)
+    :return: (scenario key, metrics dictionary)
+    """
+    scenario, seed, seconds = job
+    fleet_size = scenario["fleet_size"]
+    simulation = FactorySimulation(
+        robot_versions=versions_for(fleet_size, scenario["layout"]),
+        charger_versions=versions_for(scenario["charger_count"], scenario["layout"]),
+        operational_slots=max(1, round(fleet_size * scenario["operational_share"])),
+        task_count=fleet_size * 2,
+        seed=seed,
+        drain_rate=scenario["drain_rate"],
+        charge_rate=scenario["charge_rate"],
+        **POLICY_PARAMETERS[scenario["policy"]]
+    )
+    results = simulation.run(until=seconds)
+    metrics = {
+        "throughput_per_hour": results["tasks_completed"] / (seconds / 3600),
+        "availability": results["availability"],
+        "robot_idle_share": (results["standby_seconds"] + results["waiting_seconds"]) / (fleet_size * seconds),
+        "charger_utilization": results["charger_utilization"],
+        "brownouts": results["brownouts"],
+    }
+    return scenario_key(scenario), metrics
+
+
+def scenario_key(scenario):
+    return tuple(scenario[name] for name in sorted(scenario))
+
+
+def build_scenarios(grid):
+    """
+    Expands the parameter grid into a list of scenario dictionaries.
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_sweep(grid=DEFAULT_GRID, replications=100, days=SIMULATED_DAYS, workers=None):
+    """
+    Runs all scenarios of the grid with the given number of seeded replications on all cores.
+    :return: list of rows with the scenario parameters and mean/standard deviation of every metric
+    """
+    scenarios = build_scenarios(grid)
+    seconds = days * 24 * 60 * 60
+    jobs = [(scenario, seed, seconds) for scenario in scenarios for seed in range(replications)]
+
+    collected = {scenario_key(scenario): [] for scenario in scenarios}
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        for key, metrics in executor.map(run_replication, jobs, chunksize=chunksize):
+            collected[key].append(metrics)
+
+    rows = []
+    for scenario in scenarios:
+        replication_metrics = collected[scenario_key(scenario)]
+        row = dict(scenario)
+        row["drain_rate"] = "-".join(str(rate) for rate in scenario["drain_rate"])
+        row["replications"] = len(replication_metrics)
+        for column in RESULT_COLUMNS:
+            values = [metrics[column] for metrics in replication_metrics]
+            row[f"{column}_mean"] = statistics.fmean(values)
+            row[f"{column}_std"] = statistics.stdev(values) if len(values) > 1 else 0.0
+        rows.append(row)
+    return rows
+
+
+def main():
+    """
+    Runs the default scenario grid and writes the results table as CSV.
+    """
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep over fleet, charger and policy scenarios")
+    parser.add_argument("--replications", type=int, default=100)
+    parser.add_argument("--days", type=float, default=SIMULATED_DAYS)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to all cores")
+    parser.add_argument("--output", default="-", help="CSV file for the results table, '-' for stdout")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = run_sweep(replications=args.replications, days=args.days, workers=args.workers)
+    print(f"{len(rows)} scenarios x {args.replications} replications in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Classes
+class Robotino:
+    def __init__(self, robot_id, version, initial_status):
+        self.robot_id = robot_id
+        self.version = version
+        self.status = initial_status
+        self.battery_level = 100  # Start with a full battery
+
+    def __str__(self):
+        return f"Robotino-{self.robot_id} (Version {self.version}, {self.status}, Battery: {self.battery_level:.0f}%)"
+
+    def __lt__(self, other):
+        return self.battery_level < other.battery_level
+
+    def drain_battery(self, amount):
+        self.battery_level = max(0, self.battery_level - amount)
+
+    def recharge_battery(self):
+        """Increase the battery level by 20%, up to a maximum of 100%."""
+        if self.battery_level < 100:
+            self.battery_level = min(100, self.battery_level + 16)
+
+    def set_status(self, new_status):
+        self.status = new_status
+
+class Charger:
+    def __init__(self, charger_id, compatible_version):
+        self.charger_id = charger_id
+        self.compatible_version = compatible_version
+        self.current_robotino = None
+
+    def __str__(self):
+        status = "Available" if self.current_robotino is None else f"Charging {self.current_robotino}"
+        return f"Charger-{self.charger_id} (Compatible with Version {self.compatible_version}, {status})"
+
+    def connect(self, robotino):
+        if self.current_robotino is None and robotino.version == self.compatible_version:
+            self.current_robotino = robotino
+            robotino.set_status("charging")
+            return True
+        return False
+
+    def disconnect(self):
+        if self.current_robotino:
+            self.current_robotino = None
@@ -1,27 +1,45 @@
+import argparse
+import os
 import socket
 import threading
 import time
 import math
 import logging
-import heapq
+import itertools
+
+from battery_conversion import voltages_to_percentages
+from battery_history import HISTORY_DIRECTORY, BatteryHistory
+from charger_assignment import assign_chargers
+from charger_index import ChargerGrid
+from charger_reservations import CHARGING as LEASE_CHARGING, TRAVELING as LEASE_TRAVELING, ChargerReservations
+from charging_policies import (CHARGING, OPERATIONAL, POLICIES, TRAVELING, ChargerView, FleetSnapshot, RobotView,
+                               create_policy)
+from fleet_protocol import CommandQueue, FleetMessageDecoder, FleetStateParser, RobotRecord
+from floor_graph import FLOOR_EDGES, FLOOR_GRAPH_CACHE, FloorGraph, layout_nodes
+from indexed_priority_queue import IndexedPriorityQueue
+from metrics import METRICS_PORT, MetricsRegistry, start_metrics_server
+from predictive_scheduler import DrainTracker
+from soc_estimator import SocEstimator
+from state_store import ABORT, STATE_DIRECTORY, StateStore
+from structured_logging import setup_logging
 
 HOST = '0.0.0.0'  # Host to listen on
 PORT = 13000  # Port for server to listen on
+DATA_DIRECTORY = os.path.dirname(os.path.abspath(__file__))  # Battery history, floor graph cache and scheduler state
 
-JobId = 50  # Start with JobId 1 for Robotino Fleet
+JobId = 50  # Last JobId used before the server starts, the first job gets JobId + 1
 MAX_BUFFER_SIZE = 4096  # Maximum buffer size for incoming messages
 CURRENT_ROBOTINO_STATE = None
 BATTERY_MINIMUM_PERCENT = 20
-
-# Configure the logger
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s",
-    handlers=[
-        logging.FileHandler("charging_selection.log"),  # Logs to a file
-        logging.StreamHandler()  # Logs to the console
-    ]
-)
+RUNTIME_MINIMUM_SECONDS = 10 * 60  # Robotinos with less predicted runtime are sent to charge
+BATTERY_RELEASE_PERCENT = 80  # Charging Robotinos go back into operation from this level
+CHARGING_POLICY = "optimal-matching"  # Registered policy making the charging decisions (see charging_policies)
+POSITION_CHANGE_THRESHOLD = 0.2  # Movement in meters that triggers a new charging decision
+LOG_LEVEL = logging.INFO  # logging.DEBUG also logs every re-evaluation and unhandled message
+
+# Configure the logger: JSON lines to the rotating charging_selection.log and the console,
+# written by a background thread; identical messages are logged at most once per 30 s
+setup_logging(level=LOG_LEVEL)
 logging.info("initialized logging")
 
 # Charger locations as a dictionary with their coordinates and types
@@ -43,23 +61,75 @@ robotino_configurations = {
     25: {"type": 4},
 }
 
-# Fleet state dictionary: To store robot battery percentages and other info
+# Fleet state dictionary: To store robot battery percentages and other info (robot ID -> RobotRecord)
 fleet_state = {}
+fleet_state_parser = FleetStateParser()
+
+# State of charge estimate (coulomb counting with voltage correction) per Robotino
+soc_estimator = SocEstimator()
+
+# Battery samples of every FleetState reply are kept for charge-curve analysis (nothing is written before main())
+battery_history = BatteryHistory(os.path.join(DATA_DIRECTORY, HISTORY_DIRECTORY))
+
+# Spatial index over the charger positions and the occupancy derived from the latest fleet state
+charger_grid = ChargerGrid(charger_configurations)
+charger_occupancy = {}  # charger ID -> ID of the Robotino standing at the charger
+
+# Lease per charger for the Robotino sent there; expires if it does not start charging within the timeout
+charger_reservations = ChargerReservations(charger_configurations)
+
+# Travel distances along the aisles of the factory floor; main() caches the shortest paths in floor_graph.npz
+floor_graph = FloorGraph.load_or_build(layout_nodes(charger_configurations), FLOOR_EDGES,
+                                       path=os.path.join(DATA_DIRECTORY, FLOOR_GRAPH_CACHE), save=False)
+
+# Battery drain rate of every working Robotino, used by the predictive policy
+drain_tracker = DrainTracker()
+
+# Policy making the charging decisions; main() replaces it if another one is chosen on the command line
+charging_policy = create_policy(CHARGING_POLICY, threshold=BATTERY_MINIMUM_PERCENT, release_level=BATTERY_RELEASE_PERCENT,
+                                min_runtime=RUNTIME_MINIMUM_SECONDS, distance=floor_graph.travel_distance)
+
+# Runtime metrics, served in the Prometheus text format on METRICS_PORT by main()
+metrics = MetricsRegistry()
+fleet_state_parse_seconds = metrics.histogram("charging_fleet_state_parse_seconds", "Time to parse a FleetState reply")
+decision_seconds = metrics.histogram("charging_decision_seconds", "Time to make the charging decisions for a change")
+charger_occupied = metrics.gauge("charging_charger_occupied", "1 if a Robotino stands at the charger", ["charger"])
+charger_reserved = metrics.gauge("charging_charger_reserved", "1 if the charger is leased to a Robotino", ["charger"])
+lease_expirations = metrics.counter("charging_lease_expirations_total", "Charger leases that timed out")
+robot_battery_percent = metrics.gauge("charging_robot_battery_percent", "Battery percentage of the Robotino", ["robot"])
+queue_length = metrics.gauge("charging_queue_length", "Number of Robotinos in the queue", ["queue"])
+jobs_issued = metrics.counter("charging_jobs_issued_total", "PushJob commands issued", ["job"])
+socket_errors = metrics.counter("charging_socket_errors_total", "Socket errors per operation", ["operation"])
+
+# Held while the fleet state, the queues or the charger leases change and for a whole decision cycle: the reader
+# threads update battery priorities while a charging thread moves Robotinos between the queues
+scheduler_lock = threading.RLock()
+
+# Signalled by process_fleet_state_response when a Robotino crossed a battery or position threshold
+fleet_state_changed = threading.Condition()
+changed_robots = set()
+robot_triggers = {}  # robot ID -> (battery low, charged to the release level, charging, x, y) at the last notification
+waiting_robots = set()  # Robotinos that needed charging but got no charger in the last decision cycle
 
 
 # Lists to categorize Robotinos
 active_robotinos = []
 inactive_robotinos = []
 drained_robotinos = []
-robots_moving_to_charger = []
 
-# Initialize queues for operational and charging Robotinos
-operational_queue = [20, 21, 24]  # Robotino IDs: 2 version 3 and 1 version 4
-charging_queue = [22, 23, 25]  # Robotino IDs: 2 version 3 and 1 version 4
+# Job IDs are shared by all command builders; next() on itertools.count is atomic, so threads never get duplicates
+job_ids = itertools.count(JobId + 1)
+last_job_id = JobId  # Last job ID handed out, saved in the snapshots
 
-# Use heapq to maintain priority queue behavior
-heapq.heapify(operational_queue)
-heapq.heapify(charging_queue)
+# Snapshots of the scheduler state and a write-ahead journal of issued jobs in charging_state/,
+# restored by main() so a restart neither forgets Robotinos on their way to a charger nor re-sends their jobs
+state_store = StateStore(os.path.join(DATA_DIRECTORY, STATE_DIRECTORY))
+
+# Initialize queues for operational and charging Robotinos, prioritized by battery percentage:
+# the operational queue returns the emptiest Robotino first, the charging queue the most charged one.
+# Priorities are updated in place with every FleetState reply.
+operational_queue = IndexedPriorityQueue((robot_id, 100) for robot_id in [20, 21, 24])  # Robotino IDs: 2 version 3 and 1 version 4
+charging_queue = IndexedPriorityQueue(((robot_id, 0) for robot_id in [22, 23, 25]), reverse=True)  # Robotino IDs: 2 version 3 and 1 version 4
 
 # Simulated list of chargers (update with actual charger objects if available)
 chargers = []  # Example: chargers = [Charger(11), Charger(12), ...]
@@ -72,114 +142,131 @@ def calculate_distance(x1, y1, x2, y2):
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
-def is_charger_occupied(charger_id):
+def configure_data_directory(directory):
     """
-    Determines if a charger is occupied based on the current fleet state.
-    A charger is considered occupied if a Robotino is within 20 cm of the charger.
+    Keeps the battery history, the floor graph cache and the scheduler state in the given directory, creating
+    them if needed. Called by main() before the charging policy is configured and the state restored,
+    so importing this module writes nothing to disk.
     """
-    logging.info(f"checking if charger {charger_id} is occupied")
-    if charger_id not in charger_configurations:
-        logging.info(f"Charger ID {charger_id} is not valid.")
-        return False
+    global battery_history, floor_graph, state_store
+    os.makedirs(directory, exist_ok=True)
+    battery_history = BatteryHistory(os.path.join(directory, HISTORY_DIRECTORY))
+    floor_graph = FloorGraph.load_or_build(layout_nodes(charger_configurations), FLOOR_EDGES,
+                                           path=os.path.join(directory, FLOOR_GRAPH_CACHE))
+    state_store = StateStore(os.path.join(directory, STATE_DIRECTORY))
 
-    charger_coords = charger_configurations[charger_id]
-    charger_x, charger_y = charger_coords["X"], charger_coords["Y"]
 
-    for robot_id, robot_info in fleet_state.items():
-        robot_x, robot_y = robot_info['x'], robot_info['y']
-        distance = calculate_distance(charger_x, charger_y, robot_x, robot_y)
-        if distance <= 0.2:  # 20 cm threshold
-            logging.info(f"charger is in use {charger_id} by Robotino {robot_id}.")
-            return True  # Charger is occupied
-    logging.info(f"charger {charger_id} is not occupied.")
-    return False  # Charger is not occupied
+def configure_charging_policy(name):
+    """
+    Replaces the charging policy by the registered policy `name`, with the thresholds of this server.
+    :raises ValueError: if no policy is registered under the name
+    """
+    global charging_policy
+    charging_policy = create_policy(name, threshold=BATTERY_MINIMUM_PERCENT, release_level=BATTERY_RELEASE_PERCENT,
+                                    min_runtime=RUNTIME_MINIMUM_SECONDS, distance=floor_graph.travel_distance)
+    logging.info("charging policy: %s", charging_policy, extra={"event": "charging_policy", "policy": name})
+    return charging_policy
 
 
-def find_closest_free_charger(robot_id):
+def update_charger_occupancy():
     """
-    Finds the closest unoccupied charger for the given Robotino ID based on its position.
-    Uses dynamic occupancy checking based on fleet state.
+    Recomputes which charger is occupied by which Robotino.
+    Called once per FleetState update; the selection code only reads the cached result.
     """
-    if robot_id not in fleet_state:
-        logging.error(f"skipping search for charger of Robot {robot_id}. Cause: Robot not found in fleet state.")
-        return None
+    global charger_occupancy
+    charger_occupancy = charger_grid.occupancy(fleet_state)
+    for charger_id in charger_configurations:
+        charger_occupied.set(int(charger_id in charger_occupancy), charger=charger_id)
 
-    robot_x = fleet_state[robot_id]['x']
-    robot_y = fleet_state[robot_id]['y']
-    logging.info(f"searching charger for robot: {robot_id} (coordinates: {robot_x}, {robot_y})")
 
-    closest_charger = None
-    shortest_distance = float('inf')
-
-    for charger_id, charger_config in charger_configurations.items():
-        if is_charger_occupied(charger_id):
-            logging.info(f"skipping charger {charger_id}. Cause: occupied charger.")
-            continue  # Skip occupied chargers
-
-        if charger_configurations[charger_id]['type'] != robotino_configurations[robot_id]['type']:
-            logging.info(f"skipping charger {charger_id}. Cause: "
-                         f"charger model{charger_configurations[charger_id]['type']} does not match "
-                         f"robotino model{robotino_configurations[robot_id]['type']}.")
-            continue  # skip wrong type
+def is_charger_occupied(charger_id):
+    """
+    Determines if a charger is occupied based on the current fleet state.
+    A charger is considered occupied if a Robotino is within 20 cm of the charger.
+    """
+    if charger_id not in charger_configurations:
+        logging.info("Charger ID %s is not valid.", charger_id)
+        return False
+    return charger_id in charger_occupancy
 
-        distance = calculate_distance(robot_x, robot_y, charger_config["X"], charger_config["Y"])
-        logging.info(
-            f"coords charger: {charger_config['X']}, {charger_config['Y']} ||coords robot: {robot_x}, {robot_y} ")
-        if distance < shortest_distance:
-            closest_charger = charger_id
-            logging.info(f"selected charger {charger_id} with distance {distance} as new candidate")
-            shortest_distance = distance
 
-    if closest_charger is None:
-        logging.error(f"no charger found for robotino{robot_id}.")
-    else:
-        logging.info(f"closest charger is {closest_charger}")
-    return closest_charger
+def find_free_chargers():
+    """
+    Lists all chargers that are neither occupied nor leased to a Robotino.
+    :return: list of (charger_id, x, y, type)
+    """
+    return [
+        (charger_id, charger_config["X"], charger_config["Y"], charger_config["type"])
+        for charger_id, charger_config in charger_configurations.items()
+        if charger_id not in charger_occupancy and not charger_reservations.is_reserved(charger_id)
+    ]
 
 
-def send_robot_to_closest_charger(robot_id):
+def assign_chargers_to_robots(robot_ids):
     """
-    Generates a command to send the robot to the closest unoccupied charger.
+    Assigns free, type-compatible chargers to all given Robotinos at once (min-cost matching
+    on floor graph travel distance and battery urgency), so no charger is assigned more than once.
+    :return: dictionary robot_id -> charger_id
     """
-    global JobId
+    robots = [
+        (robot_id, fleet_state[robot_id].x, fleet_state[robot_id].y,
+         fleet_state[robot_id].battery_state or 0, robotino_configurations[robot_id]['type'])
+        for robot_id in robot_ids
+        if robot_id in fleet_state and robot_id in robotino_configurations
+    ]
+    assignments = assign_chargers(robots, find_free_chargers(), distance=floor_graph.travel_distance)
+    for robot_id in robot_ids:
+        if robot_id not in assignments:
+            logging.info("No charger assigned to Robotino %s in this cycle.", robot_id,
+                         extra={"event": "no_charger", "robot_id": robot_id})
+    return assignments
 
-    if robot_id not in fleet_state:
-        print(f"Robot ID {robot_id} not found in fleet state.")
-        return None
 
-    closest_charger = find_closest_free_charger(robot_id)
+def next_job_id():
+    """
+    Allocates a new, unique job ID for a PushJob command.
+    """
+    global last_job_id
+    job_id = last_job_id = next(job_ids)
+    return job_id
 
-    if closest_charger is None:
-        print("No available chargers.")
-        return None
 
-    JobId += 1
+def send_robot_to_charger(robot_id, charger_id, job_id=None):
+    """
+    Generates a command to send the robot to the given charger.
+    :param job_id: job ID of the command, a new one if None
+    """
+    if job_id is None:
+        job_id = next_job_id()
     command = (
-        f"PushJob GotoPosition {JobId} 1 {robot_id} {closest_charger}\n"
+        f"PushJob GotoPosition {job_id} 1 {robot_id} {charger_id}\n"
     )
-    print(f"Sending robot {robot_id} to closest charger (ID: {closest_charger}): {command}")
+    jobs_issued.inc(job="GotoPosition")
+    logging.info("Sending robot %s to charger (ID: %s): %s", robot_id, charger_id, command.strip(),
+                 extra={"event": "job", "robot_id": robot_id, "charger_id": charger_id})
     return command
 
 
 def send_all_robots_to_closest_chargers():
     """
-    Sends all Robotinos in the fleet to their closest unoccupied chargers.
-    # TODO ensure that no charger is assignment multiple times
+    Sends all Robotinos in the fleet to chargers, assigning every charger at most once.
     """
-    for robot_id in fleet_state.keys():
-        command = send_robot_to_closest_charger(robot_id)
+    for robot_id, charger_id in assign_chargers_to_robots(list(fleet_state.keys())).items():
+        command = send_robot_to_charger(robot_id, charger_id)
         if command:
             print(command)
 
 
-def send_robot_to_dock(robot_id):
+def send_robot_to_dock(robot_id, job_id=None):
     """
     Sends a command to dock the robot to the charger.
+    :param job_id: job ID of the command, a new one if None
     """
-    global JobId
-    JobId += 1
-    command = f"PushJob BatteryChargerDocking {JobId} 0 {robot_id} DOCK\n"
-    print(f"Sending robot {robot_id} to dock: {command}")
+    if job_id is None:
+        job_id = next_job_id()
+    command = f"PushJob BatteryChargerDocking {job_id} 0 {robot_id} DOCK\n"
+    jobs_issued.inc(job="BatteryChargerDocking")
+    logging.info("Sending robot %s to dock: %s", robot_id, command.strip(), extra={"event": "job", "robot_id": robot_id})
     return command
 
 
@@ -198,214 +285,535 @@ def send_robot_to_position(robot_id, target_x, target_y):
     Sends the robot to a specific position.
     # TODO remove? not in use?
     """
-    global JobId
     if robot_id not in fleet_state:
         print(f"Robot ID {robot_id} not found in fleet state.")
         return ""
 
-    JobId += 1
-    command = f"PushJob GotoPosition {JobId} 1 {robot_id} {target_x} {target_y}\n"
-    print(f"Sending robot {robot_id} to position: {command}")
+    job_id = next_job_id()
+    command = f"PushJob GotoPosition {job_id} 1 {robot_id} {target_x} {target_y}\n"
+    jobs_issued.inc(job="GotoPosition")
+    logging.info("Sending robot %s to position: %s", robot_id, command.strip(), extra={"event": "job", "robot_id": robot_id})
     return command
 
 
 def process_fleet_state_response(data):
     """
     Processes the fleet state response to extract detailed robot information.
+    The records in fleet_state are updated in place by the compiled FleetState parser.
+    :return: list of robot IDs contained in the response
+    """
+    with scheduler_lock:
+        if "FleetState" not in data:
+            return []
+
+        updated_robots = []
+        try:
+            with fleet_state_parse_seconds.time():
+                updated_robots = fleet_state_parser.parse(data, fleet_state)
+
+            update_charger_occupancy()
+
+            update_battery_states(updated_robots)
+            for robot_id in updated_robots:
+                charger_reservations.update_charging(robot_id, fleet_state[robot_id].charging)
+            battery_history.append_fleet_state(fleet_state, updated_robots)
+
+            notify_fleet_state_changed(detect_changed_robots(updated_robots))
+            logging.debug("Updated fleet state of %d Robotinos", len(updated_robots))
+        except Exception:
+            logging.exception("Error processing fleet state data")
+        return updated_robots
+
+
+def detect_changed_robots(robot_ids):
     """
-    global fleet_state
+    Selects the Robotinos whose need for charging changed (see needs_charging), whose battery crossed the release
+    level of the charging policy, that started or stopped charging or that moved more than POSITION_CHANGE_THRESHOLD
+    since their last notification.
+    Robotinos seen for the first time count as changed.
+    """
+    changed = []
+    for robot_id in robot_ids:
+        robot_info = fleet_state[robot_id]
+        if robot_info.battery_state is None:
+            continue
+        battery_low = needs_charging(robot_id)
+        charged = robot_info.battery_state >= charging_policy.release_level
+        previous = robot_triggers.get(robot_id)
+        if (previous is None or previous[:3] != (battery_low, charged, robot_info.charging)
+                or calculate_distance(previous[3], previous[4], robot_info.x, robot_info.y) > POSITION_CHANGE_THRESHOLD):
+            robot_triggers[robot_id] = (battery_low, charged, robot_info.charging, robot_info.x, robot_info.y)
+            changed.append(robot_id)
+    return changed
 
-    if "FleetState" not in data:
+
+def notify_fleet_state_changed(robot_ids):
+    """
+    Wakes up the charging management for the given Robotinos.
+    """
+    if not robot_ids:
         return
+    with fleet_state_changed:
+        changed_robots.update(robot_ids)
+        fleet_state_changed.notify_all()
 
-    try:
-        robots_data = data.replace("FleetState ", "").split(" , ")
-
-        for robotino in robots_data:
-            attributes = robotino.split()
-            robot_info = {}
-            robot_id = None
-
-            for attr in attributes:
-                key, value = attr.split(":")
-                if key == "robotinoid":
-                    robot_id = int(value)
-                elif key in {"x", "y", "phi", "current"}:
-                    robot_info[key] = float(value)
-                elif key in {"charging", "laserwarning", "lasersafety", "emergency", "boxpresent"}:
-                    robot_info[key] = bool(int(value))
-                elif key in {"state", "ipaddress"}:
-                    robot_info[key] = value
-                elif key == "batteryvoltage":
-                    try:
-                        robot_info["battery_state"] = convert_voltage_to_percentage(voltage=float(value), 
-                                                                                    robotino_id=robot_id)
-                    except ValueError as e:
-                        logging.error("Robotino ID was unexpectedly not set in process_fleet_state: " + str(e))
-
-            if robot_id is not None:
-                fleet_state[robot_id] = robot_info
-
-        print("Updated fleet state:", fleet_state)
-    except Exception as e:
-        print(f"Error processing fleet state data: {e}")
-
-
-def convert_voltage_to_percentage(voltage, robotino_id):
-    """
-    Converts voltage of a Robotino's batteries to percentage.
-    TODO currently returns values above 100% if Robotino is charging
-    :param voltage: Value in Volts from the fleet-state of the master Robotino
-    :param robotino_id: Id of the Robotino that is currently processed
-    :return:
-    """
-    if robotino_id is None:
-        raise ValueError("robotino_id is None")
-
-    if robotino_configurations[robotino_id]['type'] == 3:
-        # correct voltage min/max for model3
-        max_voltage = 24.5
-        min_voltage =  19.5 # was 18.5 but increased by one because the Robotino battery died before moving to the charger and docking( During Testing)
-    else:
-        # correct voltage min/max for model4
-        max_voltage = 20.6
-        min_voltage = 15.8
-
-    # Calculate battery percentage
-    voltage_range = max_voltage - min_voltage
-    battery_percentage = int(((voltage - min_voltage) / voltage_range) * 100)
-    return battery_percentage
-
-
-def handle_incoming_messages(conn, addr):
+
+def expire_charger_leases():
+    """
+    Ends the leases of Robotinos that did not start charging within the lease timeout (e.g. a failed dock)
+    and puts them back into the operational queue, so they are sent to a charger again.
+    :return: set of robot IDs whose lease expired
+    """
+    expired = set()
+    for lease in charger_reservations.expire():
+        lease_expirations.inc()
+        logging.warning("Lease of Robotino %s on charger %s expired, it is not charging.",
+                        lease.robot_id, lease.charger_id,
+                        extra={"event": "lease_expired", "robot_id": lease.robot_id, "charger_id": lease.charger_id})
+        charging_queue.discard(lease.robot_id)
+        if lease.robot_id in fleet_state:
+            operational_queue.push(lease.robot_id, fleet_state[lease.robot_id].battery_state or 0)
+        expired.add(lease.robot_id)
+    return expired
+
+
+def wait_for_fleet_state_changes(timeout=None, stop=None):
+    """
+    Blocks until at least one Robotino changed and returns (and clears) the set of changed Robotinos.
+    :param timeout: maximum waiting time in seconds, None waits indefinitely
+    :param stop: threading.Event ending the wait, e.g. set when the connection of the caller closed;
+                 the changes are then left to the other waiters (see notify_connection_closed)
+    :return: set of robot IDs, empty if the timeout expired or stop is set
+    """
+    with fleet_state_changed:
+        fleet_state_changed.wait_for(lambda: changed_robots or (stop is not None and stop.is_set()), timeout=timeout)
+        if stop is not None and stop.is_set():
+            return set()
+        changed = set(changed_robots)
+        changed_robots.clear()
+    return changed
+
+
+def needs_charging(robot_id):
+    """
+    Asks the charging policy whether a Robotino needs charging: with the server's thresholds if its battery is at
+    BATTERY_MINIMUM_PERCENT or below, or if the predicted runtime at its current draw is shorter than RUNTIME_MINIMUM_SECONDS.
+    """
+    return charging_policy.needs_charging(robot_view(robot_id))
+
+
+def robot_status(robot_id):
+    """
+    Status of a Robotino for the charging policy, derived from the queues and its charger lease.
+    :return: a status of charging_policies, None if the Robotino is in neither queue
+    """
+    if robot_id in operational_queue:
+        return OPERATIONAL
+    if robot_id in charging_queue:
+        lease = charger_reservations.lease_for(robot_id)
+        return CHARGING if lease is None or lease.state == LEASE_CHARGING else TRAVELING
+    return None
+
+
+def robot_view(robot_id):
+    """
+    Immutable view of one Robotino for the charging policy.
+    """
+    robot_info = fleet_state[robot_id]
+    model = robotino_configurations[robot_id]['type'] if robot_id in robotino_configurations else None
+    runtime = soc_estimator.remaining_runtime(robot_id, model) if model is not None else None
+    return RobotView(robot_id, model, robot_info.x, robot_info.y, robot_info.battery_state, robot_status(robot_id),
+                     drain_tracker.rate(robot_id), runtime)
+
+
+def fleet_snapshot(robot_ids=None):
+    """
+    Immutable view of the fleet for the charging policy: the configured Robotinos with a battery state in one of
+    the queues, and every charger with the Robotino holding its lease or standing at it.
+    The server has no model of operational slots, so open_slots is None.
+    :param robot_ids: Robotinos to include, defaults to the whole fleet
+    """
+    robots = tuple(
+        robot_view(robot_id) for robot_id in (fleet_state if robot_ids is None else robot_ids)
+        if robot_id in fleet_state and robot_id in robotino_configurations and fleet_state[robot_id].battery_state is not None
+        and (robot_id in operational_queue or robot_id in charging_queue)
+    )
+    reserved = charger_reservations.reserved_chargers()
+    chargers = []
+    for charger_id, charger_config in charger_configurations.items():
+        robot_id = reserved.get(charger_id, charger_occupancy.get(charger_id))
+        free_in = 0.0 if robot_id is None else None  # Unknown while the Robotino drives or is not ours
+        lease = charger_reservations.lease_for(robot_id) if robot_id is not None else None
+        if lease is not None and lease.state == LEASE_CHARGING and robot_id in fleet_state:
+            battery = fleet_state[robot_id].battery_state or 0
+            free_in = max(0.0, charging_policy.release_level - battery) / charging_policy.charge_rate * 3600
+        chargers.append(ChargerView(charger_id, charger_config["type"], charger_config["X"], charger_config["Y"],
+                                    robot_id, free_in))
+    return FleetSnapshot(time.monotonic(), robots, tuple(chargers), None)
+
+
+def update_battery_states(robot_ids):
+    """
+    Converts the battery voltages of all given Robotinos to percentages in a single vectorized pass.
+    """
+    converted_robots = []
+    for robot_id in robot_ids:
+        if fleet_state[robot_id].battery_voltage is None:
+            continue
+        if robot_id not in robotino_configurations:
+            logging.error("Robotino %s is missing in robotino_configurations.", robot_id)
+            continue
+        converted_robots.append(robot_id)
+    if not converted_robots:
+        return
+
+    percentages = voltages_to_percentages(
+        [fleet_state[robot_id].battery_voltage for robot_id in converted_robots],
+        [robotino_configurations[robot_id]['type'] for robot_id in converted_robots]
+    )
+    timestamp = time.monotonic()
+    for robot_id, percentage in zip(converted_robots, percentages.tolist()):
+        robot_info = fleet_state[robot_id]
+        robot_info.battery_state = percentage
+        robot_battery_percent.set(percentage, robot=robot_id)
+        for queue in (operational_queue, charging_queue):
+            if robot_id in queue:
+                queue.update(robot_id, percentage)
+        soc_estimator.update(robot_id, robotino_configurations[robot_id]['type'], robot_info.battery_voltage,
+                             robot_info.current, robot_info.charging, timestamp)
+        drain_tracker.update(robot_id, percentage, timestamp,
+                             working=robot_id in operational_queue and not robot_info.charging)
+
+
+def handle_unknown_message(message):
+    """
+    Handles messages of the fleet manager that have no dedicated handler yet.
+    # TODO include other feedback messages (e.g. when a robotino arrives at a location)
+    """
+    logging.debug("Unhandled message: %s", message)
+
+
+def notify_connection_closed(closed):
+    """
+    Marks a fleet manager connection as closed and wakes its charging management thread, so it stops
+    instead of competing with the threads of newer connections for the fleet state changes.
+    """
+    closed.set()
+    with fleet_state_changed:
+        fleet_state_changed.notify_all()
+
+
+def handle_incoming_messages(conn, addr, closed=None):
     """
     Handles incoming messages from the client.
+    The stream is split into newline terminated messages, so replies larger than
+    MAX_BUFFER_SIZE or split across several reads are reassembled before parsing.
+    :param closed: threading.Event of the connection, set when the client closed it or receiving failed
     """
     print('Connected to', addr)
+    decoder = FleetMessageDecoder(
+        handlers={"FleetState": process_fleet_state_response},
+        default_handler=handle_unknown_message
+    )
 
-    while True:
-        try:
-            data = conn.recv(MAX_BUFFER_SIZE)
-            if not data:  # Connection closed
-                print('Connection closed by', addr)
+    try:
+        while True:
+            try:
+                data = conn.recv(MAX_BUFFER_SIZE)
+                if not data:  # Connection closed
+                    print('Connection closed by', addr)
+                    break
+                decoder.feed(data)
+            except Exception as e:
+                socket_errors.inc(operation="receive")
+                print(f"Error receiving message from {addr}: {e}")
                 break
-            decoded_data = data.decode('utf-8').strip()
-            print('Received message from', addr, ':', decoded_data)
-            # Process the fleet state response
-            if "FleetState" in decoded_data:
-                process_fleet_state_response(decoded_data)
-            # TODO include other feedback messages (e.g. when a robotino arrives at a location)
-        except Exception as e:
-            print(f"Error receiving message from {addr}: {e}")
-            break
+    finally:
+        if closed is not None:
+            notify_connection_closed(closed)
 
 
-def send_fleet_state(conn):
+def send_fleet_state(conn, closed=None):
     """
     Sends the "GetFleetState" message every 2 seconds to maintain the connection.
+    :param closed: threading.Event of the connection, ends the loop once set
     """
-    while True:
+    closed = closed or threading.Event()
+    while not closed.is_set():
         try:
             message_to_send = "GetFleetState\n"
             conn.sendall(message_to_send.encode('utf-8'))
-            print("Sent: GetFleetState")
-            time.sleep(2)
+            logging.debug("Sent: GetFleetState")
+            closed.wait(2)
         except Exception as e:
+            socket_errors.inc(operation="send_fleet_state")
             print(f"Error sending fleet state: {e}")
             break
 
 
-def charging_management(conn):
+def return_idle_robotinos():
     """
-    Manages the charging process for Robotinos.
-    Ensures only a limited number of Robotinos are charging simultaneously
-    and puts Robotinos back to work when charged.
+    Puts Robotinos of the charging queue back into operation that neither hold a charger lease nor charge,
+    e.g. Robotinos of the initial charging queue that are not docked.
+    :return: set of robot IDs put back into operation
     """
-    global JobId
-    global robots_moving_to_charger
+    returned = set()
+    for robot_id in list(charging_queue):
+        if (robot_id in fleet_state and not fleet_state[robot_id].charging
+                and charger_reservations.lease_for(robot_id) is None):
+            logging.info("Robotino %s is not charging, back to operation.", robot_id,
+                         extra={"event": "charging_completed", "robot_id": robot_id})
+            charging_queue.remove(robot_id)
+            operational_queue.push(robot_id, fleet_state[robot_id].battery_state or 0)
+            returned.add(robot_id)
+    return returned
 
-    while True:
-        # Log operational queue state for debugging
-        logging.info(f"Operational queue: {operational_queue}")
-        logging.info(f"Fleet state: {fleet_state}")
-
-        # Filter Robotinos with low battery in the operational queue
-        low_battery_robotinos = [
-            robot_id for robot_id in operational_queue
-            if robot_id in fleet_state and fleet_state[robot_id]['battery_state'] <= BATTERY_MINIMUM_PERCENT
-        ]
-
-        # Log any robot IDs missing in the fleet_state
-        for robot_id in operational_queue:
-            if robot_id not in fleet_state:
-                logging.warning(f"Robotino {robot_id} not found in fleet_state.")
-
-        if not low_battery_robotinos:
-            logging.info("No Robotino in the operational queue requires charging.")
-            time.sleep(5)  # Wait before checking again
-            continue
 
-        logging.info(f"Robotinos needing charge: {low_battery_robotinos}")
+def scheduler_state():
+    """
+    Collects the scheduler state for a snapshot: fleet state records, both queues with their priorities,
+    the charger leases and the last job ID.
+    """
+    return {
+        "fleet_state": [
+            [record.robot_id, record.x, record.y, record.phi, record.current, record.battery_voltage,
+             record.battery_state, record.charging, record.state]
+            for record in list(fleet_state.values())
+        ],
+        "operational_queue": [[robot_id, operational_queue.priority(robot_id)] for robot_id in operational_queue],
+        "charging_queue": [[robot_id, charging_queue.priority(robot_id)] for robot_id in charging_queue],
+        "leases": charger_reservations.export(),
+        "last_job_id": last_job_id,
+        "journal_sequence": state_store.sequence,
+    }
+
+
+def capture_state():
+    """
+    Collects the scheduler state for a snapshot once SNAPSHOT_INTERVAL passed since the last one.
+    Call while holding scheduler_lock, right after the decision cycle.
+    :return: the state for persist_state or None if no snapshot is due
+    """
+    return scheduler_state() if state_store.snapshot_due() else None
 
-        # Ensure only a limited number of chargers are in use (currently not being used buc could be used in future for  avoiding multiple robots go to same charger)
-        current_charging_count = len(robots_moving_to_charger)
-        available_charger_slots = 3 - current_charging_count
 
-        if available_charger_slots <= 0:
-            logging.info("All chargers are currently in use.")
-            time.sleep(5)  # Wait before checking again
-            continue
+def persist_state(state=None):
+    """
+    Writes the jobs recorded since the last call to the journal and the captured state as snapshot.
+    Must complete before the commands of the cycle are sent, so every job sent is journaled.
+    Dispatches between two snapshots are covered by the journal; releases and expired leases lost in a
+    crash are decided again by the charging policy after the restart, without sending a job.
+    """
+    try:
+        state_store.sync()
+        if state is not None:
+            state_store.save_snapshot(state)
+    except OSError as e:
+        logging.error("Scheduler state not written: %s", e)
 
-        # Limit the number of Robotinos sent for charging
-        low_battery_robotinos = low_battery_robotinos[:available_charger_slots]
 
-        # Assign chargers and send Robotinos to charge
-        for robot_id in low_battery_robotinos:
-            if robot_id in robots_moving_to_charger:
-                logging.debug(f"Robotino {robot_id} is already being sent to a charger.")
+def abort_dispatches(robot_ids):
+    """
+    Undoes the dispatches whose commands could not be sent: releases the charger leases, puts the
+    Robotinos back into operation and journals abort records, so a restart does not restore the leases.
+    The Robotinos wait for a charger again, so the next decision cycle offers them to the policy even if
+    their fleet state does not change any more.
+    """
+    aborted = set()
+    with scheduler_lock:
+        for robot_id in robot_ids:
+            lease = charger_reservations.release(robot_id)
+            if lease is None:
                 continue
-
-            message_to_send = send_robot_to_closest_charger(robot_id)
-            if not message_to_send:
-                logging.info(f"No chargers available for Robotino {robot_id}.")
+            aborted.add(robot_id)
+            waiting_robots.add(robot_id)
+            logging.warning("Dispatch of Robotino %s to charger %s not sent, lease released.", robot_id,
+                            lease.charger_id, extra={"event": "dispatch_aborted", "robot_id": robot_id,
+                                                     "charger_id": lease.charger_id})
+            state_store.record_abort(robot_id, lease.charger_id)
+            charging_queue.discard(robot_id)
+            if robot_id in fleet_state and robot_id not in operational_queue:
+                operational_queue.push(robot_id, fleet_state[robot_id].battery_state or 0)
+    persist_state()
+    notify_fleet_state_changed(aborted)
+
+
+def restore_state():
+    """
+    Warm restart: restores the fleet state, the queues, the charger leases and the job IDs from the last
+    snapshot, then replays the jobs journaled after it. Robotinos sent to a charger after the snapshot get
+    their lease back, so they are not dispatched a second time. Lease timeouts continue across the downtime.
+    :return: True if any state was restored
+    """
+    global job_ids, last_job_id, operational_queue, charging_queue
+    with scheduler_lock:
+        started = time.perf_counter()
+        snapshot, entries = state_store.load()
+        if snapshot is None and not entries:
+            return False
+
+        if snapshot is not None:
+            downtime = max(0.0, time.time() - snapshot["saved_at"])
+            for robot_id, x, y, phi, current, voltage, battery, charging, state in snapshot["fleet_state"]:
+                record = fleet_state.setdefault(robot_id, RobotRecord(robot_id))
+                record.x, record.y, record.phi, record.current = x, y, phi, current
+                record.battery_voltage, record.battery_state, record.charging, record.state = voltage, battery, charging, state
+            operational_queue = IndexedPriorityQueue(map(tuple, snapshot["operational_queue"]))
+            charging_queue = IndexedPriorityQueue(map(tuple, snapshot["charging_queue"]), reverse=True)
+            charger_reservations.clear()
+            for charger_id, robot_id, state, remaining in snapshot["leases"]:
+                if charger_id not in charger_configurations:
+                    logging.warning("Skipping lease of Robotino %s on charger %s, which is no longer configured.",
+                                    robot_id, charger_id, extra={"event": "lease_skipped", "robot_id": robot_id,
+                                                                 "charger_id": charger_id})
+                    continue
+                charger_reservations.restore(charger_id, robot_id, state,
+                                             None if remaining is None else remaining - downtime)
+            last_job_id = max(last_job_id, snapshot["last_job_id"])
+
+        for entry in entries:
+            robot_id, charger_id = entry["robot_id"], entry["charger_id"]
+            if entry["kind"] == ABORT:
+                # The dispatch was never sent: drop its lease unless the Robotino is charging there anyway
+                lease = charger_reservations.lease_for(robot_id)
+                if lease is not None and lease.charger_id == charger_id and lease.state == LEASE_TRAVELING:
+                    charger_reservations.release(robot_id)
+                    charging_queue.discard(robot_id)
+                    if robot_id in fleet_state and robot_id not in operational_queue:
+                        operational_queue.push(robot_id, fleet_state[robot_id].battery_state or 0)
                 continue
-
-            logging.info(f"Assigning Robotino {robot_id} to charger.")
+            last_job_id = max(last_job_id, entry["job_id"])
+            if entry["kind"] != "GotoPosition" or charger_id not in charger_configurations:
+                continue
+            if charger_reservations.lease_for(robot_id) is None and not charger_reservations.is_reserved(charger_id):
+                charger_reservations.restore(charger_id, robot_id, LEASE_TRAVELING,
+                                             charger_reservations.timeout - (time.time() - entry["time"]))
+            operational_queue.discard(robot_id)
+            if robot_id not in charging_queue:
+                battery = fleet_state[robot_id].battery_state if robot_id in fleet_state else None
+                charging_queue.push(robot_id, battery or 0)
+
+        job_ids = itertools.count(last_job_id + 1)
+        logging.info("Restored %d Robotinos, %d leases and %d journaled jobs in %.1f ms, next job ID %d",
+                     len(fleet_state), len(charger_reservations), len(entries),
+                     (time.perf_counter() - started) * 1e3, last_job_id + 1,
+                     extra={"event": "state_restored", "journaled_jobs": len(entries)})
+        return True
+
+
+def evaluate_charging_decisions(changed, send_commands):
+    """
+    Makes the charging decisions with the configured charging policy. The policy sees a snapshot of the whole fleet
+    but only considers the Robotinos that changed, whose lease expired or that still wait for a charger (a fleet-wide
+    policy may still send others early); the Robotinos it dispatches are sent to their charger, which is leased to
+    them, and the Robotinos it releases go back into operation.
+    :param changed: set of robot IDs reported by wait_for_fleet_state_changes
+    :param send_commands: callable taking a robot ID and the list of commands for that Robotino,
+                          usually queueing them for a single write after the decisions are made
+    :return: set of Robotinos that need charging but got no charger in this cycle
+    """
+    global waiting_robots
+    with scheduler_lock:
+        started = time.perf_counter()
+        expired = expire_charger_leases()
+        considered = changed | expired | return_idle_robotinos() | waiting_robots
+        snapshot = fleet_snapshot()
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Re-evaluating Robotinos %s. Operational queue: %s", sorted(considered),
+                          operational_queue.sorted_items())
+
+        decisions = charging_policy.decide(snapshot, considered)
+        low_battery_robotinos = [robot.robot_id for robot in snapshot.robots if robot.robot_id in considered
+                                 and robot.status == OPERATIONAL and charging_policy.needs_charging(robot)]
+        pending_robotinos = set(low_battery_robotinos)
+
+        if low_battery_robotinos:
+            logging.info("Robotinos needing charge: %s", low_battery_robotinos,
+                         extra={"event": "needs_charging", "robot_ids": low_battery_robotinos})
+            if all(charger.robot_id is not None for charger in snapshot.chargers):
+                logging.info("All chargers are currently in use.")
+
+        for robot_id, charger_id in decisions.dispatch:
+            early = robot_id not in pending_robotinos
+            logging.info("Assigning Robotino %s to charger %s%s.", robot_id, charger_id, " to charge early" if early else "",
+                         extra={"event": "charger_assigned", "robot_id": robot_id, "charger_id": charger_id, "early": early})
             try:
-                # Send Robotino to the charger
-                conn.sendall(message_to_send.encode('utf-8'))
-                # Send docking command immediatly (sequencd execution handled by job quege of the robotino itself)
-                time.sleep(.2) # time for the server to process the first message - might be uneccessary
-                message_to_send = send_robot_to_dock(robot_id)
-                conn.sendall(message_to_send.encode('utf-8'))
+                # Send Robotino to the charger and dock it (sequenced execution handled by job queue of the robotino itself)
+                goto_job, dock_job = next_job_id(), next_job_id()
+                send_commands(robot_id, [send_robot_to_charger(robot_id, charger_id, goto_job),
+                                         send_robot_to_dock(robot_id, dock_job)])
+
+                # Journaled only once the commands are queued; persist_state writes them before they are sent
+                state_store.record_job(goto_job, "GotoPosition", robot_id, charger_id)
+                state_store.record_job(dock_job, "BatteryChargerDocking", robot_id)
 
-                # Mark Robotino as moving to charger
-                robots_moving_to_charger.append(robot_id)
+                # Reserve the charger until the Robotino has charged or the lease expires
+                charger_reservations.reserve(charger_id, robot_id)
+                pending_robotinos.discard(robot_id)
 
                 # Remove from operational queue and add to charging queue
                 operational_queue.remove(robot_id)
-                charging_queue.append(robot_id)
+                charging_queue.push(robot_id, fleet_state[robot_id].battery_state)
 
             except Exception as e:
-                logging.error(f"Error sending message for Robotino {robot_id}: {e}")
+                logging.error("Error sending message for Robotino %s: %s", robot_id, e)
                 break
 
-        # Check if any Robotinos have completed charging
-        charged_robotinos = [
-            robot_id for robot_id in charging_queue
-            if robot_id in fleet_state and fleet_state[robot_id]['battery_state'] > BATTERY_MINIMUM_PERCENT
-        ]
+        for robot_id in pending_robotinos:
+            logging.info("No charger assigned to Robotino %s in this cycle.", robot_id,
+                         extra={"event": "no_charger", "robot_id": robot_id})
 
-        for robot_id in charged_robotinos:
-            logging.info(f"Robotino {robot_id} has completed charging.")
+        # Robotinos released by the policy have completed charging
+        for robot_id in decisions.release:
+            logging.info("Robotino %s has completed charging.", robot_id,
+                         extra={"event": "charging_completed", "robot_id": robot_id})
             charging_queue.remove(robot_id)
-            operational_queue.append(robot_id)
+            operational_queue.push(robot_id, fleet_state[robot_id].battery_state)
+
+            charger_reservations.release(robot_id)
 
-            # Remove from the moving to charger list
-            if robot_id in robots_moving_to_charger:
-                robots_moving_to_charger.remove(robot_id)
+        queue_length.set(len(operational_queue), queue="operational")
+        queue_length.set(len(charging_queue), queue="charging")
+        queue_length.set(len(pending_robotinos), queue="pending")
+        reserved = charger_reservations.reserved_chargers()
+        for charger_id in charger_configurations:
+            charger_reserved.set(int(charger_id in reserved), charger=charger_id)
+        waiting_robots = pending_robotinos
+        decision_seconds.observe(time.perf_counter() - started)
+        return pending_robotinos
 
-        time.sleep(5)  # Wait before the next iteration
+
+def charging_management(conn, closed=None):
+    """
+    Manages the charging process for Robotinos.
+    Decisions are re-evaluated whenever process_fleet_state_response reports changed Robotinos,
+    and when the earliest charger lease expires; without expiring leases it waits for changes only.
+    :param closed: threading.Event of the connection; the thread ends once it is set
+    """
+    closed = closed or threading.Event()
+    command_queue = CommandQueue()
+    while True:
+        changed = wait_for_fleet_state_changes(timeout=charger_reservations.next_expiry(), stop=closed)
+        if closed.is_set():
+            break
+        dispatched = []
+
+        def send_commands(robot_id, commands):
+            command_queue.put(*commands)
+            dispatched.append(robot_id)
+
+        with scheduler_lock:
+            evaluate_charging_decisions(changed, send_commands)
+            state = capture_state()
+        persist_state(state)
+        try:
+            # All commands of this cycle go out with a single sendall
+            command_queue.flush(conn.sendall)
+        except Exception as e:
+            socket_errors.inc(operation="send_commands")
+            logging.error("Error sending charging commands: %s", e)
+            abort_dispatches(dispatched)
+            break
 
 
 # Function to monitor and print Robotino statuses
@@ -425,29 +833,40 @@ def monitor_robotino_status(active_robotinos, inactive_robotinos, drained_roboti
         time.sleep(120)
 
 
-def main():
+def main(host=HOST, port=PORT, policy=CHARGING_POLICY, data_directory=DATA_DIRECTORY):
     """
     Main function to start the server, accept clients, and create threads for handling messages and sending messages.
+    :param host: address to listen on
+    :param port: port to listen on (the benchmark harness uses a free port instead of 13000)
+    :param policy: name of the registered charging policy (see charging_policies)
+    :param data_directory: directory of the battery history, the floor graph cache and the scheduler state
     """
+    configure_data_directory(data_directory)
+    configure_charging_policy(policy)
+    restore_state()
+    # Battery samples are written by a background thread, not while the reader threads hold the scheduler lock
+    battery_history.start_writer()
     # Initialize lists to categorize Robotinos
     active_robotinos = []
     inactive_robotinos = []
     drained_robotinos = []
 
-    # Initialize queues for operational and charging Robotinos
-    operational_queue = [20, 21, 24]  # Robotino IDs: 2 version 3 and 1 version 4
-    charging_queue = [22, 23, 25]  # Robotino IDs: 2 version 3 and 1 version 4
-
     print("Initialized Robotino lists and queues:")
     print(f"Active Robotinos: {active_robotinos}")
     print(f"Inactive Robotinos: {inactive_robotinos}")
     print(f"Drained Robotinos: {drained_robotinos}")
     print(f"Operational Queue: {operational_queue}")
 
+    try:
+        start_metrics_server(metrics, port=METRICS_PORT)
+        print(f"Metrics available on http://127.0.0.1:{METRICS_PORT}/metrics")
+    except OSError as e:
+        logging.error("Metrics endpoint not started: %s", e)
+
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind((HOST, PORT))
+        s.bind((host, port))
         s.listen()
-        print(f"Server running and listening on {HOST}:{PORT}")
+        print(f"Server running and listening on {host}:{port}")
 
         while True:
             try:
@@ -455,13 +874,21 @@ def main():
                 print(f"Client connected from {addr}")
 
                 # Start threads for handling client interaction
-                threading.Thread(target=handle_incoming_messages, args=(conn, addr)).start()
-                threading.Thread(target=send_fleet_state, args=(conn,)).start()
-                threading.Thread(target=charging_management, args=(conn,)).start()
+                # The reader sets closed when the client disconnects, which ends the other two threads
+                closed = threading.Event()
+                threading.Thread(target=handle_incoming_messages, args=(conn, addr, closed)).start()
+                threading.Thread(target=send_fleet_state, args=(conn, closed)).start()
+                threading.Thread(target=charging_management, args=(conn, closed)).start()
             except Exception as e:
+                socket_errors.inc(operation="accept")
                 print("Error accepting connection:", e)
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Charging server for the Robotino fleet")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default=CHARGING_POLICY)
+    parser.add_argument("--data-directory", default=DATA_DIRECTORY,
+                        help="directory of the battery history, floor graph cache and scheduler state")
+    args = parser.parse_args()
+    main(policy=args.policy, data_directory=args.data_directory)
     print(f"Charging Queue: {charging_queue}")
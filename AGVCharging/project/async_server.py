@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import logging
+
+import Final_version as charging
+from fleet_protocol import CommandQueue, FleetMessageDecoder
+from metrics import METRICS_PORT, start_metrics_server
+
+FLEET_STATE_INTERVAL = 2  # Seconds between two GetFleetState requests per connection
+
+
+class FleetServer:
+    """
+    asyncio based charging server.
+    Every fleet manager connection gets a reader and a FleetState poller task; a single charging
+    scheduler task serves all connections and sends each command to the connection that reported
+    the Robotino. The charging logic and the fleet state are shared with Final_version.
+    """
+
+    def __init__(self, host=charging.HOST, port=charging.PORT, fleet_state_interval=FLEET_STATE_INTERVAL):
+        self.host = host
+        self.port = port
+        self.fleet_state_interval = fleet_state_interval
+        self.robot_connections = {}  # robot ID -> StreamWriter of the fleet manager reporting the Robotino
+        self.command_queues = {}  # StreamWriter -> CommandQueue with the commands of the current cycle
+        self.dispatched = {}  # StreamWriter -> IDs of the Robotinos dispatched to it in the current cycle
+        self.connection_tasks = set()
+        self.fleet_state_changed = None
+        self.server = None
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves one fleet manager connection until it is closed by the client or the server shuts down.
+        """
+        addr = writer.get_extra_info('peername')
+        print(f"Client connected from {addr}")
+        poller = asyncio.create_task(self.poll_fleet_state(writer))
+        try:
+            await self.read_messages(reader, writer)
+        except asyncio.CancelledError:
+            pass
+        except (ConnectionError, OSError) as e:
+            charging.socket_errors.inc(operation="receive")
+            print(f"Error receiving message from {addr}: {e}")
+        finally:
+            poller.cancel()
+            self.command_queues.pop(writer, None)
+            for robot_id, robot_writer in list(self.robot_connections.items()):
+                if robot_writer is writer:
+                    del self.robot_connections[robot_id]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            print('Connection closed by', addr)
+
+    async def read_messages(self, reader, writer):
+        """
+        Reads the stream of a fleet manager and processes every complete message.
+        """
+        def handle_fleet_state(message):
+            for robot_id in charging.process_fleet_state_response(message):
+                self.robot_connections[robot_id] = writer
+            if charging.changed_robots:
+                self.fleet_state_changed.set()
+
+        decoder = FleetMessageDecoder(
+            handlers={"FleetState": handle_fleet_state},
+            default_handler=charging.handle_unknown_message
+        )
+        while True:
+            data = await reader.read(charging.MAX_BUFFER_SIZE)
+            if not data:  # Connection closed
+                return
+            decoder.feed(data)
+
+    async def poll_fleet_state(self, writer):
+        """
+        Sends the "GetFleetState" message every fleet_state_interval seconds.
+        """
+        try:
+            while True:
+                writer.write(b"GetFleetState\n")
+                await writer.drain()
+                await asyncio.sleep(self.fleet_state_interval)
+        except (ConnectionError, OSError) as e:
+            charging.socket_errors.inc(operation="send_fleet_state")
+            print(f"Error sending fleet state: {e}")
+
+    async def schedule_charging(self):
+        """
+        Runs the charging decisions whenever a connection reported changed Robotinos,
+        and when the earliest charger lease expires; without expiring leases it waits for changes only.
+        Dispatches to a connection that closed before its commands could be written are aborted.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self.fleet_state_changed.wait(),
+                                       timeout=charging.charger_reservations.next_expiry())
+            except asyncio.TimeoutError:
+                pass
+            self.fleet_state_changed.clear()
+            changed = charging.wait_for_fleet_state_changes(timeout=0)
+            with charging.scheduler_lock:
+                charging.evaluate_charging_decisions(changed, self.send_commands)
+                state = charging.capture_state()
+            # Journal and snapshot fsync off the event loop; the commands are sent once they are durable
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, charging.persist_state, state)
+            dispatched, self.dispatched = self.dispatched, {}
+            for writer, robot_ids in dispatched.items():
+                command_queue = self.command_queues.get(writer)
+                if command_queue is not None and not writer.is_closing():
+                    command_queue.flush(writer.write)
+                    continue
+                # The connection closed while the jobs were persisted: undo the journaled jobs and leases
+                self.command_queues.pop(writer, None)
+                charging.socket_errors.inc(operation="send_commands")
+                await loop.run_in_executor(None, charging.abort_dispatches, robot_ids)
+                self.fleet_state_changed.set()
+
+    def send_commands(self, robot_id, commands):
+        """
+        Queues the commands for the connection of the fleet manager responsible for the Robotino.
+        The queues of all connections are flushed with one write each after the decision cycle.
+        """
+        writer = self.robot_connections.get(robot_id)
+        if writer is None or writer.is_closing():
+            raise ConnectionError(f"no open connection for Robotino {robot_id}")
+        self.command_queues.setdefault(writer, CommandQueue()).put(*commands)
+        self.dispatched.setdefault(writer, []).append(robot_id)
+
+    async def serve(self):
+        """
+        Accepts fleet manager connections until the task is cancelled, then shuts everything down.
+        """
+        self.fleet_state_changed = asyncio.Event()
+        scheduler = asyncio.create_task(self.schedule_charging())
+        self.server = await asyncio.start_server(self._track_connection, self.host, self.port)
+        print(f"Server running and listening on {self.host}:{self.port}")
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            scheduler.cancel()
+            for task in list(self.connection_tasks):
+                task.cancel()
+            await asyncio.gather(scheduler, *self.connection_tasks, return_exceptions=True)
+            logging.info("fleet server stopped")
+
+    async def _track_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connection_tasks.add(task)
+        try:
+            await self.handle_connection(reader, writer)
+        finally:
+            self.connection_tasks.discard(task)
+
+
+def main():
+    """
+    Starts the asyncio charging server and its metrics endpoint; Ctrl+C shuts it down cleanly.
+    """
+    parser = argparse.ArgumentParser(description="asyncio charging server for the Robotino fleet")
+    parser.add_argument("--policy", choices=sorted(charging.POLICIES), default=charging.CHARGING_POLICY)
+    parser.add_argument("--data-directory", default=charging.DATA_DIRECTORY,
+                        help="directory of the battery history, floor graph cache and scheduler state")
+    args = parser.parse_args()
+    charging.configure_data_directory(args.data_directory)
+    charging.configure_charging_policy(args.policy)
+    charging.restore_state()
+    # Battery samples are appended by a background thread instead of the event loop
+    charging.battery_history.start_writer()
+    try:
+        start_metrics_server(charging.metrics, port=METRICS_PORT)
+    except OSError as e:
+        logging.error("Metrics endpoint not started: %s", e)
+    try:
+        asyncio.run(FleetServer().serve())
+    except KeyboardInterrupt:
+        print("Server stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Voltage range of the batteries per Robotino model
+BATTERY_CALIBRATION = {
+    3: {"min_voltage": 19.5,  # was 18.5 but increased by one because the Robotino battery died before moving to the charger and docking( During Testing)
+        "max_voltage": 24.5},
+    4: {"min_voltage": 15.8,
+        "max_voltage": 20.6},
+}
+
+# Chassis type names used by the Robotino web interface
+CHASSIS_TYPES = {"model3": 3, "model4": 4}
+
+
+def _build_lookup_tables(calibration):
+    """
+    Builds arrays indexed by model number with the minimum voltage and the voltage range of each model.
+    """
+    size = max(calibration) + 1
+    min_voltages = np.full(size, np.nan)
+    voltage_ranges = np.full(size, np.nan)
+    for model, limits in calibration.items():
+        min_voltages[model] = limits["min_voltage"]
+        voltage_ranges[model] = limits["max_voltage"] - limits["min_voltage"]
+    return min_voltages, voltage_ranges
+
+
+_MIN_VOLTAGES, _VOLTAGE_RANGES = _build_lookup_tables(BATTERY_CALIBRATION)
+
+
+def voltages_to_percentages(voltages, models):
+    """
+    Converts the battery voltages of many Robotinos to percentages in one pass.
+    Results are truncated to whole percent like the former per-Robotino conversion of the server (int()) and
+    clamped to 0..100 %, so the raised voltage while charging no longer yields values above 100 %.
+    :param voltages: array-like of voltages in Volts
+    :param models: array-like of Robotino model numbers (3 or 4), same length as voltages
+    :return: numpy array of integer percentages
+    """
+    voltages = np.asarray(voltages, dtype=float)
+    models = np.asarray(models, dtype=int)
+    if np.any((models < 0) | (models >= len(_MIN_VOLTAGES))) or np.isnan(_MIN_VOLTAGES[models]).any():
+        raise ValueError(f"no battery calibration for models {sorted(set(models.tolist()) - set(BATTERY_CALIBRATION))}")
+
+    percentages = (voltages - _MIN_VOLTAGES[models]) / _VOLTAGE_RANGES[models] * 100
+    return np.clip(np.floor(percentages), 0, 100).astype(int)
+
+
+def voltage_to_percentage(voltage, model):
+    """
+    Converts the battery voltage of a single Robotino to a percentage.
+    """
+    return int(voltages_to_percentages([voltage], [model])[0])
@@ -0,0 +1,210 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+HISTORY_DIRECTORY = "battery_history"
+CHUNK_SECONDS = 24 * 60 * 60  # One file per UTC day
+
+# Fixed-width on-disk record (30 bytes, little endian, no padding)
+SAMPLE_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("robot_id", "<u4"),
+    ("voltage", "<f4"),
+    ("current", "<f4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("percent", "i1"),
+    ("charging", "u1"),
+])
+
+
+class BatteryHistory:
+    """
+    Append-only time-series store for the battery samples of the fleet.
+    Samples are written as fixed-width binary records into one chunk file per Robotino and day
+    (<directory>/<robot ID>/<chunk start>.bin). Queries memory-map only the chunks of the requested
+    Robotinos overlapping the requested time window and select the records with a binary search on the
+    timestamp, since samples are appended in time order. Chunks of the whole fleet written directly into
+    the directory by earlier versions are still read.
+    """
+
+    def __init__(self, directory=HISTORY_DIRECTORY, chunk_seconds=CHUNK_SECONDS):
+        self.directory = directory
+        self.chunk_seconds = chunk_seconds
+        self.lock = threading.Lock()
+        self.writes = None  # Queue of sample arrays for the writer thread, None while appends write directly
+        self.created_robots = set()  # Robotinos whose directory exists, created with their first append
+        self.open_chunks = {}  # robot ID -> (chunk start, unbuffered file) of the chunk last appended to
+
+    def start_writer(self):
+        """
+        Moves the file appends to a daemon thread, so callers on the event loop or holding the scheduler lock
+        do not wait for the disk. Samples are written in the order they were appended.
+        """
+        if self.writes is None:
+            self.writes = queue.Queue()
+            threading.Thread(target=self._write_queued, name="battery-history-writer", daemon=True).start()
+
+    def _write_queued(self):
+        while True:
+            samples = self.writes.get()
+            try:
+                self._write(samples)
+            except OSError as e:
+                logging.error("Battery samples not written: %s", e)
+            finally:
+                self.writes.task_done()
+
+    def flush(self):
+        """
+        Waits until the writer thread has written all appended samples.
+        """
+        if self.writes is not None:
+            self.writes.join()
+
+    def _chunk_start(self, timestamp):
+        return int(timestamp // self.chunk_seconds) * self.chunk_seconds
+
+    def _chunk_path(self, chunk_start, robot_id=None):
+        """
+        :param robot_id: Robotino of the chunk, None for a fleet chunk of earlier versions
+        """
+        if robot_id is None:
+            return os.path.join(self.directory, f"{chunk_start}.bin")
+        return os.path.join(self.directory, str(robot_id), f"{chunk_start}.bin")
+
+    def append(self, samples):
+        """
+        Appends samples to the store.
+        :param samples: structured array of SAMPLE_DTYPE or list of tuples in SAMPLE_DTYPE field order,
+                        with non-decreasing timestamps
+        """
+        samples = np.asarray(samples, dtype=SAMPLE_DTYPE)
+        if samples.size == 0:
+            return
+        if self.writes is not None:
+            self.writes.put(samples)
+        else:
+            self._write(samples)
+
+    def _write(self, samples):
+        chunk_starts = (samples["timestamp"] // self.chunk_seconds).astype(np.int64) * self.chunk_seconds
+        # Group the samples by Robotino and chunk with one stable sort, keeping the time order within a group
+        order = np.lexsort((chunk_starts, samples["robot_id"]))
+        samples, chunk_starts = samples[order], chunk_starts[order]
+        robot_ids = samples["robot_id"]
+        boundaries = np.flatnonzero((robot_ids[1:] != robot_ids[:-1]) | (chunk_starts[1:] != chunk_starts[:-1])) + 1
+        with self.lock:
+            for first, last in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(samples)]))):
+                robot_id = int(robot_ids[first])
+                if robot_id not in self.created_robots:
+                    os.makedirs(os.path.join(self.directory, str(robot_id)), exist_ok=True)
+                    self.created_robots.add(robot_id)
+                self._chunk_file(robot_id, int(chunk_starts[first])).write(samples[first:last].tobytes())
+
+    def _chunk_file(self, robot_id, chunk_start):
+        """
+        Returns the open chunk file of a Robotino, so every fleet state does not open one file per Robotino.
+        Writes are unbuffered, so queries see every written sample.
+        """
+        current = self.open_chunks.get(robot_id)
+        if current is not None and current[0] == chunk_start:
+            return current[1]
+        if current is not None:
+            current[1].close()
+        chunk_file = open(self._chunk_path(chunk_start, robot_id), "ab", buffering=0)
+        self.open_chunks[robot_id] = (chunk_start, chunk_file)
+        return chunk_file
+
+    def close(self):
+        """
+        Closes the open chunk files; later appends open them again.
+        """
+        self.flush()
+        with self.lock:
+            for _, chunk_file in self.open_chunks.values():
+                chunk_file.close()
+            self.open_chunks.clear()
+
+    def append_fleet_state(self, fleet_state, robot_ids=None, timestamp=None):
+        """
+        Appends one sample per Robotino from the records of the charging server's fleet state.
+        :param fleet_state: dictionary robot_id -> RobotRecord
+        :param robot_ids: Robotinos to record, defaults to all
+        :param timestamp: sample time in seconds since the epoch, defaults to now
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        samples = []
+        for robot_id in fleet_state if robot_ids is None else robot_ids:
+            robot_info = fleet_state[robot_id]
+            if robot_info.battery_voltage is None:
+                continue
+            percent = -1 if robot_info.battery_state is None else robot_info.battery_state
+            samples.append((timestamp, robot_id, robot_info.battery_voltage, robot_info.current,
+                            robot_info.x, robot_info.y, percent, robot_info.charging))
+        self.append(samples)
+
+    def robots(self):
+        """
+        Returns the IDs of all Robotinos with samples in ascending order.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(name) for name in os.listdir(self.directory) if name.isdigit())
+
+    def chunks(self, robot_id=None):
+        """
+        Returns the start times of all chunk files of a Robotino in ascending order.
+        :param robot_id: Robotino of the chunks, None for the fleet chunks of earlier versions
+        """
+        directory = self.directory if robot_id is None else os.path.join(self.directory, str(robot_id))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith(".bin"))
+
+    def _read_window(self, robot_id, start, end):
+        """
+        Returns the samples within [start, end) of the chunks of one Robotino, or of the fleet chunks for None.
+        """
+        selected = []
+        for chunk_start in self.chunks(robot_id):
+            if end is not None and chunk_start >= end:
+                break
+            if start is not None and chunk_start + self.chunk_seconds <= start:
+                continue
+            path = self._chunk_path(chunk_start, robot_id)
+            if os.path.getsize(path) < SAMPLE_DTYPE.itemsize:
+                continue
+            records = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r",
+                                shape=(os.path.getsize(path) // SAMPLE_DTYPE.itemsize,))
+            timestamps = records["timestamp"]
+            first = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+            last = len(records) if end is None else np.searchsorted(timestamps, end, side="left")
+            selected.append(np.array(records[first:last]))
+        return selected
+
+    def query(self, robot_id=None, start=None, end=None):
+        """
+        Returns all samples within [start, end) for one or all Robotinos.
+        :param robot_id: Robotino to select, None for the whole fleet
+        :param start: window start in seconds since the epoch, None for no lower bound
+        :param end: window end in seconds since the epoch, None for no upper bound
+        :return: structured array of SAMPLE_DTYPE in time order
+        """
+        self.flush()
+        selected = []
+        for legacy in self._read_window(None, start, end):
+            selected.append(legacy if robot_id is None else legacy[legacy["robot_id"] == robot_id])
+        for robot in self.robots() if robot_id is None else [robot_id]:
+            selected.extend(self._read_window(robot, start, end))
+        if not selected:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        samples = np.concatenate(selected)
+        if robot_id is None:
+            # Merge the Robotinos in time order; the stable sort keeps the append order of equal timestamps
+            samples = samples[np.argsort(samples["timestamp"], kind="stable")]
+        return samples
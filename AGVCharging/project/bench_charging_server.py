@@ -0,0 +1,312 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from datetime import datetime, timezone
+
+from fleet_emulator import FIRST_ROBOT_ID, EmulatedRobot, model_for
+from fleet_protocol import FleetMessageDecoder, FleetStateParser
+from indexed_priority_queue import IndexedPriorityQueue
+
+FLEET_SIZES = [6, 60, 300, 600]
+TRIALS = 50  # Low battery events per fleet size
+PARSE_REPETITIONS = 50
+TIMEOUT = 5.0  # Seconds to wait for the server before a trial counts as lost
+HEALTHY_BATTERY = 80.0  # Percent reported for Robotinos that are not under test
+LOW_BATTERY = 10.0  # Percent reported to trigger a charging decision
+RESULTS_FILE = "bench_charging_server.json"
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(share * (len(ordered) - 1)))]
+
+
+def summarize(samples):
+    """
+    Returns mean, median, 95th percentile and maximum of the samples in milliseconds.
+    """
+    if not samples:
+        return None
+    return {"mean": statistics.fmean(samples) * 1e3, "p50": percentile(samples, 0.5) * 1e3,
+            "p95": percentile(samples, 0.95) * 1e3, "max": max(samples) * 1e3, "count": len(samples)}
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def resource_usage():
+    """
+    Returns (CPU seconds, peak resident memory in MB) of this process.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss / 1024  # ru_maxrss is in kB on Linux
+
+
+class FleetManagerClient:
+    """
+    Synthetic fleet manager for the benchmark: answers the server's GetFleetState polls, can push a
+    FleetState at any time and records when PushJob commands for a Robotino arrive.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.robots = {}
+        self.entries = {}
+        self.send_lock = threading.Lock()
+        self.dispatched = threading.Condition()
+        self.goto_received = {}  # robot ID -> perf_counter time of the last PushJob GotoPosition
+        self.commands_received = 0
+        self.decoder = FleetMessageDecoder(
+            handlers={"GetFleetState": lambda message: self.send_fleet_state(), "PushJob": self.handle_push_job}
+        )
+
+    def set_fleet(self, robots):
+        with self.send_lock:
+            self.robots = robots
+            self.entries = {robot_id: robot.fleet_state_entry() for robot_id, robot in robots.items()}
+        with self.dispatched:
+            self.goto_received.clear()
+            self.commands_received = 0
+
+    def set_battery(self, robot_id, battery, charging=False):
+        robot = self.robots[robot_id]
+        robot.battery = battery
+        robot.charging = robot.docked = charging
+        self.entries[robot_id] = robot.fleet_state_entry()
+
+    def send_fleet_state(self):
+        """
+        Sends the current FleetState and returns the time it was sent.
+        """
+        with self.send_lock:
+            message = ("FleetState " + " , ".join(self.entries.values()) + "\n").encode("utf-8")
+            sent = time.perf_counter()
+            self.conn.sendall(message)
+        return sent
+
+    def handle_push_job(self, message):
+        received = time.perf_counter()
+        parts = message.split()
+        with self.dispatched:
+            self.commands_received += 1
+            if parts[1] == "GotoPosition":
+                self.goto_received[int(parts[4])] = received
+                self.dispatched.notify_all()
+
+    def wait_for_dispatch(self, robot_id, timeout=TIMEOUT):
+        with self.dispatched:
+            if self.dispatched.wait_for(lambda: robot_id in self.goto_received, timeout=timeout):
+                return self.goto_received.pop(robot_id)
+        return None
+
+    def receive(self):
+        while True:
+            try:
+                data = self.conn.recv(65536)
+            except OSError:
+                break
+            if not data:
+                break
+            self.decoder.feed(data)
+
+
+def reset_server_state(server, robots):
+    """
+    Puts the server module back to an idle state for a new synthetic fleet: all Robotinos configured
+    and operational, nothing moving to a charger.
+    """
+    server.robotino_configurations.clear()
+    server.robotino_configurations.update({robot_id: {"type": robot.model} for robot_id, robot in robots.items()})
+    server.fleet_state.clear()
+    server.robot_triggers.clear()
+    server.waiting_robots = set()
+    server.soc_estimator.states.clear()
+    server.drain_tracker.clear()
+    server.charger_reservations.clear()
+    server.operational_queue = IndexedPriorityQueue((robot_id, 100) for robot_id in robots)
+    server.charging_queue = IndexedPriorityQueue(reverse=True)
+    with server.fleet_state_changed:
+        server.changed_robots.clear()
+
+
+def wait_until(condition, timeout=TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.0005)
+    return True
+
+
+def measure_parse_time(message):
+    parser = FleetStateParser()
+    records = {}
+    parser.parse(message, records)
+    return timeit.timeit(lambda: parser.parse(message, records), number=PARSE_REPETITIONS) / PARSE_REPETITIONS
+
+
+def benchmark_fleet(server, client, robot_count, trials, processing_times):
+    """
+    Runs the low battery trials for one fleet size against the running server.
+    Each trial reports one Robotino below the threshold, waits for its PushJob GotoPosition
+    and then reports it docked and fully charged so the server takes it back into operation.
+    """
+    robots = {}
+    for index in range(robot_count):
+        robot_id = FIRST_ROBOT_ID + index
+        robots[robot_id] = EmulatedRobot(robot_id, model_for(index), -8.0 + index % 10, 3.0 + index // 10 * 0.01,
+                                         HEALTHY_BATTERY, drain_rate=30.0)
+    reset_server_state(server, robots)
+    client.set_fleet(robots)
+    client.send_fleet_state()
+    wait_until(lambda: len(server.fleet_state) == robot_count)
+    processing_times.clear()
+
+    message = "FleetState " + " , ".join(client.entries.values())
+    parse_seconds = measure_parse_time(message)
+    cpu_before, _ = resource_usage()
+    started = time.perf_counter()
+    latencies = []
+    lost = 0
+    robot_ids = list(robots)
+    for trial in range(trials):
+        robot_id = robot_ids[trial % len(robot_ids)]
+        client.set_battery(robot_id, LOW_BATTERY)
+        sent = client.send_fleet_state()
+        received = client.wait_for_dispatch(robot_id)
+        if received is None:
+            lost += 1
+        else:
+            latencies.append(received - sent)
+        client.set_battery(robot_id, 100.0, charging=True)
+        client.send_fleet_state()
+        wait_until(lambda: robot_id in server.operational_queue)
+    elapsed = time.perf_counter() - started
+    cpu_after, max_rss = resource_usage()
+
+    return {
+        "robot_count": robot_count,
+        "fleet_state_bytes": len(message) + 1,
+        "parse_ms": parse_seconds * 1e3,
+        "process_fleet_state_ms": summarize(list(processing_times)),
+        "dispatch_latency_ms": summarize(latencies),
+        "trials": trials,
+        "lost_trials": lost,
+        "commands_per_second": client.commands_received / elapsed,
+        "cpu_seconds": cpu_after - cpu_before,
+        "cpu_percent": (cpu_after - cpu_before) / elapsed * 100,
+        "max_rss_mb": max_rss,
+    }
+
+
+def connect_to_server(port, timeout=TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return socket.create_connection(("127.0.0.1", port))
+        except ConnectionRefusedError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def start_server(server, processing_times):
+    """
+    Starts Final_version's server on a free port with process_fleet_state_response timed.
+    :return: the port
+    """
+    process_fleet_state_response = server.process_fleet_state_response
+
+    def timed_process_fleet_state_response(data):
+        started = time.perf_counter()
+        try:
+            return process_fleet_state_response(data)
+        finally:
+            processing_times.append(time.perf_counter() - started)
+
+    server.process_fleet_state_response = timed_process_fleet_state_response
+    port = find_free_port()
+    threading.Thread(target=server.main, kwargs={"host": "127.0.0.1", "port": port, "data_directory": os.getcwd()},
+                     daemon=True).start()
+    return port
+
+
+def main():
+    """
+    Drives Final_version.py's server over loopback with synthetic fleets of increasing size and writes
+    parse time, dispatch latency, command throughput, CPU and memory per fleet size as JSON.
+    The trials run back to back, so commands per second is the rate the server sustains when every
+    FleetState pushed to it needs a charging decision. The benchmark client runs in the same process,
+    so CPU and memory include its (small) share.
+    """
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of the charging server")
+    parser.add_argument("--sizes", type=int, nargs="+", default=FLEET_SIZES, help="fleet sizes to benchmark")
+    parser.add_argument("--trials", type=int, default=TRIALS, help="low battery events per fleet size")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON file for the results")
+    parser.add_argument("--label", default=None, help="name of the measured version, defaults to the git revision")
+    parser.add_argument("--verbose", action="store_true", help="keep the server's console output and debug logs")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    # The server writes its log file to the working directory, which also serves as its data directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_charging_server_"))
+    import Final_version as server
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    processing_times = []
+    results = []
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+        # A single connection for all fleet sizes: the server starts a charging management thread per connection
+        conn = stack.enter_context(connect_to_server(start_server(server, processing_times)))
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = FleetManagerClient(conn)
+        threading.Thread(target=client.receive, daemon=True).start()
+        for robot_count in args.sizes:
+            result = benchmark_fleet(server, client, robot_count, args.trials, processing_times)
+            results.append(result)
+            latency = result["dispatch_latency_ms"] or {}
+            print(f"{robot_count:>5} robots: parse {result['parse_ms']:.2f} ms, "
+                  f"dispatch p50 {latency.get('p50', float('nan')):.2f} ms p95 {latency.get('p95', float('nan')):.2f} ms, "
+                  f"{result['commands_per_second']:.0f} commands/s, CPU {result['cpu_percent']:.0f} %",
+                  file=sys.stderr)
+
+    report = {
+        "label": args.label or git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import random
+import timeit
+
+from fleet_protocol import FleetStateParser
+
+FLEET_SIZES = [6, 60, 600]
+REPETITIONS = 200
+
+
+def build_fleet_state_message(robot_count, seed=0):
+    """
+    Builds a synthetic FleetState message for the given number of Robotinos.
+    """
+    rng = random.Random(seed)
+    robots = []
+    for i in range(robot_count):
+        robots.append(
+            f"robotinoid:{20 + i} x:{rng.uniform(-16, 1):.3f} y:{rng.uniform(-2, 5):.3f} "
+            f"phi:{rng.uniform(-180, 180):.2f} state:IDLE ipaddress:172.21.{20 + i % 200}.90 "
+            f"batteryvoltage:{rng.uniform(19.5, 24.5):.2f} current:{rng.uniform(0.5, 3):.2f} "
+            f"charging:0 laserwarning:0 lasersafety:0 emergency:0 boxpresent:{i % 2}"
+        )
+    return "FleetState " + " , ".join(robots)
+
+
+def main():
+    """
+    Measures the time needed to parse one FleetState poll for growing fleet sizes.
+    """
+    parser = FleetStateParser()
+    print(f"{'robots':>8} {'bytes':>8} {'us/poll':>10}")
+    for robot_count in FLEET_SIZES:
+        message = build_fleet_state_message(robot_count)
+        records = {}
+        parser.parse(message, records)  # Warm up: allocate the records once
+        seconds = timeit.timeit(lambda: parser.parse(message, records), number=REPETITIONS)
+        print(f"{robot_count:>8} {len(message):>8} {seconds / REPETITIONS * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
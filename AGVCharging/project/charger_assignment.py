@@ -0,0 +1,124 @@
+import math
+
+URGENCY_WEIGHT = 0.5  # Meters of extra travel a robot is worth per missing battery percent
+UNSERVED_PENALTY = 1000.0  # Cost of leaving a robot without a charger in this cycle
+
+
+def euclidean_distance(x1, y1, x2, y2):
+    """
+    Calculates the Euclidean distance between two points (x1, y1) and (x2, y2).
+    """
+    return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+
+
+def solve_assignment(cost):
+    """
+    Solves the rectangular assignment problem with the Hungarian algorithm (O(n^2 * m)).
+    :param cost: cost matrix as list of rows, with at most as many rows as columns
+    :return: list with the assigned column for every row
+    """
+    rows = len(cost)
+    if rows == 0:
+        return []
+    columns = len(cost[0])
+    if rows > columns:
+        raise ValueError("the cost matrix needs at least as many columns as rows")
+
+    # Potentials and matching use 1-based indices, index 0 is the virtual start column
+    u = [0.0] * (rows + 1)
+    v = [0.0] * (columns + 1)
+    row_of_column = [0] * (columns + 1)
+    previous_column = [0] * (columns + 1)
+
+    for row in range(1, rows + 1):
+        row_of_column[0] = row
+        column = 0
+        min_slack = [math.inf] * (columns + 1)
+        used = [False] * (columns + 1)
+        while True:
+            used[column] = True
+            current_row = row_of_column[column]
+            delta = math.inf
+            next_column = 0
+            for j in range(1, columns + 1):
+                if used[j]:
+                    continue
+                slack = cost[current_row - 1][j - 1] - u[current_row] - v[j]
+                if slack < min_slack[j]:
+                    min_slack[j] = slack
+                    previous_column[j] = column
+                if min_slack[j] < delta:
+                    delta = min_slack[j]
+                    next_column = j
+            for j in range(columns + 1):
+                if used[j]:
+                    u[row_of_column[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            column = next_column
+            if row_of_column[column] == 0:
+                break
+        # Flip the augmenting path
+        while column:
+            last_column = previous_column[column]
+            row_of_column[column] = row_of_column[last_column]
+            column = last_column
+
+    assignment = [0] * rows
+    for j in range(1, columns + 1):
+        if row_of_column[j]:
+            assignment[row_of_column[j] - 1] = j - 1
+    return assignment
+
+
+def assign_chargers(robots, chargers, distance=euclidean_distance,
+                    urgency_weight=URGENCY_WEIGHT, unserved_penalty=UNSERVED_PENALTY):
+    """
+    Assigns free chargers to all robots needing charge with one min-cost matching per Robotino type.
+    Assigning a robot costs the travel distance to the charger; leaving it without a charger costs
+    a penalty that grows with its missing battery charge, so the most urgent robots are served first
+    when chargers are scarce. No charger is assigned more than once.
+    :param robots: list of (robot_id, x, y, battery_percent, type)
+    :param chargers: list of (charger_id, x, y, type) of free chargers
+    :param distance: function (x1, y1, x2, y2) -> travel distance
+    :return: dictionary robot_id -> charger_id
+    """
+    assignments = {}
+    for robot_type in {robot[4] for robot in robots}:
+        typed_robots = [robot for robot in robots if robot[4] == robot_type]
+        typed_chargers = [charger for charger in chargers if charger[3] == robot_type]
+        if not typed_chargers:
+            continue
+
+        # One dummy column per robot represents "no charger in this cycle"
+        cost = []
+        for robot_id, robot_x, robot_y, battery_percent, _ in typed_robots:
+            unserved = unserved_penalty + urgency_weight * (100 - battery_percent)
+            row = [distance(robot_x, robot_y, charger_x, charger_y)
+                   for _, charger_x, charger_y, _ in typed_chargers]
+            row.extend([unserved] * len(typed_robots))
+            cost.append(row)
+
+        for row, column in enumerate(solve_assignment(cost)):
+            if column < len(typed_chargers):
+                assignments[typed_robots[row][0]] = typed_chargers[column][0]
+    return assignments
+
+
+def assign_chargers_greedy(robots, chargers, distance=euclidean_distance):
+    """
+    Reference strategy: every robot in turn takes the nearest compatible charger that is still free.
+    :return: dictionary robot_id -> charger_id
+    """
+    assignments = {}
+    taken = set()
+    for robot_id, robot_x, robot_y, _, robot_type in robots:
+        candidates = [(distance(robot_x, robot_y, charger_x, charger_y), charger_id)
+                      for charger_id, charger_x, charger_y, charger_type in chargers
+                      if charger_type == robot_type and charger_id not in taken]
+        if candidates:
+            charger_id = min(candidates)[1]
+            assignments[robot_id] = charger_id
+            taken.add(charger_id)
+    return assignments
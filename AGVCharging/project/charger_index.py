@@ -0,0 +1,51 @@
+import math
+
+OCCUPANCY_RADIUS = 0.2  # A charger is occupied if a Robotino is within 20 cm of it
+
+
+class ChargerGrid:
+    """
+    Uniform grid over the charger coordinates for radius queries.
+    The cell size equals the query radius, so every charger within the radius of a point
+    lies in the 3x3 block of cells around that point.
+    """
+
+    def __init__(self, charger_configurations, radius=OCCUPANCY_RADIUS):
+        """
+        :param charger_configurations: dictionary charger_id -> {"X": ..., "Y": ..., "type": ...}
+        :param radius: query radius in meters
+        """
+        self.radius = radius
+        self.cells = {}
+        for charger_id, charger_config in charger_configurations.items():
+            cell = self._cell(charger_config["X"], charger_config["Y"])
+            self.cells.setdefault(cell, []).append((charger_id, charger_config["X"], charger_config["Y"]))
+
+    def _cell(self, x, y):
+        return math.floor(x / self.radius), math.floor(y / self.radius)
+
+    def chargers_near(self, x, y):
+        """
+        Returns the IDs of all chargers within the query radius of the point (x, y).
+        """
+        cell_x, cell_y = self._cell(x, y)
+        radius_squared = self.radius * self.radius
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for charger_id, charger_x, charger_y in self.cells.get((cell_x + dx, cell_y + dy), ()):
+                    if (charger_x - x) ** 2 + (charger_y - y) ** 2 <= radius_squared:
+                        found.append(charger_id)
+        return found
+
+    def occupancy(self, fleet_state):
+        """
+        Computes which Robotino occupies which charger.
+        :param fleet_state: dictionary robot_id -> RobotRecord
+        :return: dictionary charger_id -> robot_id for all occupied chargers
+        """
+        occupants = {}
+        for robot_id, robot_info in fleet_state.items():
+            for charger_id in self.chargers_near(robot_info.x, robot_info.y):
+                occupants.setdefault(charger_id, robot_id)
+        return occupants
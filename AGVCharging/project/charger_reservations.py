@@ -0,0 +1,167 @@
+import threading
+import time
+
+LEASE_TIMEOUT = 10 * 60  # Seconds a Robotino has to reach and dock at its charger before the lease expires
+
+# Lease states
+TRAVELING = "traveling"  # Sent to the charger, not charging yet
+CHARGING = "charging"  # Docked and charging, the lease does not expire
+
+
+class Lease:
+    """
+    Reservation of one charger for one Robotino.
+    """
+    __slots__ = ("charger_id", "robot_id", "state", "created", "expires")
+
+    def __init__(self, charger_id, robot_id, created, expires):
+        self.charger_id = charger_id
+        self.robot_id = robot_id
+        self.state = TRAVELING
+        self.created = created
+        self.expires = expires  # Monotonic time, None while charging
+
+    def __repr__(self):
+        return f"Lease(charger_id={self.charger_id}, robot_id={self.robot_id}, state={self.state})"
+
+
+class ChargerReservations:
+    """
+    Reservation table keyed by charger ID.
+    Dispatching a Robotino takes a lease on its charger, so no other Robotino is sent there while it drives.
+    The lease ends when charging is finished (release) or when the Robotino did not start charging
+    within the timeout (expire), e.g. after a failed dock. The capacity is the number of configured chargers.
+    """
+
+    def __init__(self, charger_configurations, timeout=LEASE_TIMEOUT, clock=time.monotonic):
+        """
+        :param charger_configurations: dictionary charger_id -> {"X": ..., "Y": ..., "type": ...}
+        :param timeout: seconds until a lease of a Robotino that is not charging expires
+        :param clock: function returning the current time in seconds
+        """
+        self.charger_ids = list(charger_configurations)
+        self.timeout = timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.leases = {}  # charger ID -> Lease
+        self.robot_leases = {}  # robot ID -> Lease
+
+    @property
+    def capacity(self):
+        return len(self.charger_ids)
+
+    def __len__(self):
+        return len(self.leases)
+
+    def available(self):
+        """
+        Number of chargers without a lease.
+        """
+        return self.capacity - len(self.leases)
+
+    def is_reserved(self, charger_id):
+        return charger_id in self.leases
+
+    def lease_for(self, robot_id):
+        return self.robot_leases.get(robot_id)
+
+    def reserved_chargers(self):
+        """
+        Returns the dictionary charger_id -> robot_id of all leases.
+        """
+        with self.lock:
+            return {charger_id: lease.robot_id for charger_id, lease in self.leases.items()}
+
+    def reserve(self, charger_id, robot_id):
+        """
+        Takes the lease on a charger for a Robotino that is sent there.
+        :raises ValueError: if the charger is unknown or already reserved, or the Robotino holds a lease
+        """
+        with self.lock:
+            if charger_id not in self.charger_ids:
+                raise ValueError(f"charger {charger_id} is not configured")
+            if charger_id in self.leases:
+                raise ValueError(f"charger {charger_id} is already reserved for Robotino {self.leases[charger_id].robot_id}")
+            if robot_id in self.robot_leases:
+                raise ValueError(f"Robotino {robot_id} already holds a lease on charger {self.robot_leases[robot_id].charger_id}")
+            now = self.clock()
+            lease = Lease(charger_id, robot_id, now, now + self.timeout)
+            self.leases[charger_id] = self.robot_leases[robot_id] = lease
+            return lease
+
+    def update_charging(self, robot_id, charging):
+        """
+        Updates the lease of a Robotino with its charging flag from the fleet state: the lease stops
+        expiring while the Robotino charges and gets a new timeout if it stops charging early.
+        """
+        with self.lock:
+            lease = self.robot_leases.get(robot_id)
+            if lease is None:
+                return
+            if charging and lease.state != CHARGING:
+                lease.state = CHARGING
+                lease.expires = None
+            elif not charging and lease.state == CHARGING:
+                lease.state = TRAVELING
+                lease.expires = self.clock() + self.timeout
+
+    def release(self, robot_id):
+        """
+        Ends the lease of a Robotino.
+        :return: the released Lease or None if the Robotino held none
+        """
+        with self.lock:
+            lease = self.robot_leases.pop(robot_id, None)
+            if lease is not None:
+                del self.leases[lease.charger_id]
+            return lease
+
+    def expire(self):
+        """
+        Removes and returns all leases whose timeout passed.
+        """
+        now = self.clock()
+        with self.lock:
+            expired = [lease for lease in self.leases.values() if lease.expires is not None and lease.expires <= now]
+            for lease in expired:
+                del self.leases[lease.charger_id]
+                del self.robot_leases[lease.robot_id]
+            return expired
+
+    def next_expiry(self):
+        """
+        Seconds until the earliest lease expires, 0 if one already expired.
+        :return: the waiting time or None if no lease can expire (none held or all charging)
+        """
+        with self.lock:
+            deadlines = [lease.expires for lease in self.leases.values() if lease.expires is not None]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - self.clock())
+
+    def export(self):
+        """
+        Returns all leases as (charger_id, robot_id, state, seconds until expiry or None) for a snapshot;
+        the remaining time does not depend on the monotonic clock of this process.
+        """
+        now = self.clock()
+        with self.lock:
+            return [(lease.charger_id, lease.robot_id, lease.state,
+                     None if lease.expires is None else lease.expires - now) for lease in self.leases.values()]
+
+    def restore(self, charger_id, robot_id, state, remaining):
+        """
+        Re-creates a lease from a snapshot or the job journal.
+        :param remaining: seconds until the lease expires, None for a charging Robotino
+        :raises ValueError: like reserve()
+        """
+        lease = self.reserve(charger_id, robot_id)
+        with self.lock:
+            lease.state = state
+            lease.expires = None if remaining is None else self.clock() + remaining
+        return lease
+
+    def clear(self):
+        with self.lock:
+            self.leases.clear()
+            self.robot_leases.clear()
@@ -0,0 +1,232 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+from charger_assignment import assign_chargers, euclidean_distance
+from predictive_scheduler import HORIZON_SECONDS, OPPORTUNITY_MAX_BATTERY, plan_early_dispatch
+
+# Robotino statuses in a snapshot
+OPERATIONAL = "operational"  # Working
+STANDBY = "standby"  # Ready to work, no slot or task
+WAITING = "waiting"  # Stopped working to charge, no charger yet
+TRAVELING = "traveling"  # Sent to a charger
+CHARGING = "charging"  # Docked and charging
+
+CHARGE_RATE = 60.0  # Assumed charging speed in percent per hour
+
+# Immutable view of the fleet handed to a policy.
+# robots: tuple of RobotView; chargers: tuple of ChargerView; time in seconds;
+# open_slots: operational slots without a Robotino, None if the caller has no slot model (live server)
+FleetSnapshot = namedtuple("FleetSnapshot", ["time", "robots", "chargers", "open_slots"])
+# drain_rate: percent per hour while working, None if unknown; runtime: predicted seconds left, None if unknown
+RobotView = namedtuple("RobotView", ["robot_id", "model", "x", "y", "battery", "status", "drain_rate", "runtime"])
+# robot_id: Robotino holding or standing at the charger, None if free; free_in: seconds until free, None if unknown
+ChargerView = namedtuple("ChargerView", ["charger_id", "model", "x", "y", "robot_id", "free_in"])
+# dispatch: tuple of (robot ID, charger ID); release: tuple of robot IDs that may stop charging
+Decisions = namedtuple("Decisions", ["dispatch", "release"])
+
+POLICIES = {}  # Registered policy classes by name
+
+
+def register_policy(policy_class):
+    """
+    Class decorator adding a policy to the registry under its `name`.
+    """
+    POLICIES[policy_class.name] = policy_class
+    return policy_class
+
+
+def create_policy(name, **options):
+    """
+    Creates the registered policy `name` with the given options (see ChargingPolicy).
+    :raises ValueError: if no policy is registered under the name
+    """
+    if name not in POLICIES:
+        raise ValueError(f"unknown charging policy {name}, expected one of {sorted(POLICIES)}")
+    return POLICIES[name](**options)
+
+
+class ChargingPolicy(ABC):
+    """
+    Decides which Robotinos go to which charger and which charging Robotinos may return to work,
+    based only on an immutable FleetSnapshot. The simulator and the live server build the snapshot
+    and apply the decisions in their own way, so a policy runs unchanged in both.
+    Subclasses choose the chargers by implementing assign().
+    """
+    name = None
+
+    def __init__(self, threshold=20, release_level=None, min_runtime=None, charge_rate=CHARGE_RATE,
+                 distance=euclidean_distance):
+        """
+        :param threshold: battery percent at or below which a Robotino needs charging
+        :param release_level: battery percent from which a charging Robotino may return to work,
+                              defaults to the threshold
+        :param min_runtime: Robotinos with a shorter predicted runtime in seconds also need charging
+        :param charge_rate: charging speed in percent per hour, used to plan charger slots
+        :param distance: function (x1, y1, x2, y2) -> travel distance
+        """
+        self.threshold = threshold
+        self.release_level = threshold if release_level is None else release_level
+        self.min_runtime = min_runtime
+        self.charge_rate = charge_rate
+        self.distance = distance
+
+    def __repr__(self):
+        return f"{type(self).__name__}(threshold={self.threshold}, release_level={self.release_level})"
+
+    def needs_charging(self, robot):
+        if robot.battery <= self.threshold:
+            return True
+        return self.min_runtime is not None and robot.runtime is not None and robot.runtime < self.min_runtime
+
+    def decide(self, snapshot, considered=None):
+        """
+        :param considered: IDs of the Robotinos that may be dispatched or released, defaults to all Robotinos
+                           of the snapshot; the others are still seen, e.g. to plan the charger slots
+        :return: Decisions for the snapshot
+        """
+        candidates = sorted(
+            (robot for robot in snapshot.robots
+             if robot.status in (OPERATIONAL, WAITING) and self.needs_charging(robot)
+             and (considered is None or robot.robot_id in considered)),
+            key=lambda robot: robot.battery
+        )
+        free_chargers = [charger for charger in snapshot.chargers if charger.robot_id is None]
+        dispatch = self.assign(candidates, free_chargers, snapshot) if candidates and free_chargers else {}
+        return Decisions(tuple(dispatch.items()), tuple(self.select_releases(snapshot, considered)))
+
+    @abstractmethod
+    def assign(self, robots, chargers, snapshot):
+        """
+        Chooses chargers for the Robotinos needing charge (most urgent first).
+        :return: dictionary robot_id -> charger_id, every charger used at most once
+        """
+
+    def select_releases(self, snapshot, considered=None):
+        """
+        Charging Robotinos at or above the release level that no longer need charging, most charged first.
+        With a slot model only as many as the open slots standby Robotinos cannot fill are released.
+        """
+        releasable = sorted(
+            (robot for robot in snapshot.robots
+             if robot.status == CHARGING and robot.battery >= self.release_level and not self.needs_charging(robot)
+             and (considered is None or robot.robot_id in considered)),
+            key=lambda robot: -robot.battery
+        )
+        if snapshot.open_slots is None:
+            return [robot.robot_id for robot in releasable]
+        standby = sum(1 for robot in snapshot.robots if robot.status == STANDBY)
+        return [robot.robot_id for robot in releasable[:max(0, snapshot.open_slots - standby)]]
+
+
+@register_policy
+class ThresholdPolicy(ChargingPolicy):
+    """
+    Sends every Robotino at the threshold to the first free compatible charger in configuration order.
+    """
+    name = "threshold"
+
+    def assign(self, robots, chargers, snapshot):
+        assignments = {}
+        used = set()
+        for robot in robots:
+            for charger in chargers:
+                if charger.model == robot.model and charger.charger_id not in used:
+                    assignments[robot.robot_id] = charger.charger_id
+                    used.add(charger.charger_id)
+                    break
+        return assignments
+
+
+@register_policy
+class NearestFreePolicy(ChargingPolicy):
+    """
+    Sends the most urgent Robotino first, each to the nearest free compatible charger.
+    """
+    name = "nearest-free"
+
+    def assign(self, robots, chargers, snapshot):
+        assignments = {}
+        used = set()
+        for robot in robots:
+            compatible = [charger for charger in chargers
+                          if charger.model == robot.model and charger.charger_id not in used]
+            if not compatible:
+                continue
+            nearest = min(compatible, key=lambda charger: self.distance(robot.x, robot.y, charger.x, charger.y))
+            assignments[robot.robot_id] = nearest.charger_id
+            used.add(nearest.charger_id)
+        return assignments
+
+
+@register_policy
+class OptimalMatchingPolicy(ChargingPolicy):
+    """
+    Assigns all Robotinos needing charge at once by min-cost matching on travel distance and urgency.
+    """
+    name = "optimal-matching"
+
+    def assign(self, robots, chargers, snapshot):
+        return assign_chargers(
+            [(robot.robot_id, robot.x, robot.y, robot.battery, robot.model) for robot in robots],
+            [(charger.charger_id, charger.x, charger.y, charger.model) for charger in chargers],
+            distance=self.distance
+        )
+
+
+@register_policy
+class PredictivePolicy(OptimalMatchingPolicy):
+    """
+    Optimal matching for the Robotinos needing charge, plus opportunity charging: working Robotinos are
+    sent early to chargers that would otherwise idle while a queue builds up within the horizon
+    (see predictive_scheduler.plan_early_dispatch). With a slot model, only as many Robotinos are sent
+    early as standby or releasable Robotinos can take over their work.
+    The slot plan covers every working Robotino of the snapshot, so an early dispatch is not limited
+    to the considered Robotinos: the charger idles whichever Robotino changed.
+    """
+    name = "predictive"
+
+    def __init__(self, horizon=HORIZON_SECONDS, max_battery=OPPORTUNITY_MAX_BATTERY, **options):
+        super().__init__(**options)
+        self.horizon = horizon
+        self.max_battery = max_battery
+
+    def decide(self, snapshot, considered=None):
+        decisions = super().decide(snapshot, considered)
+        dispatched = {robot_id for robot_id, _ in decisions.dispatch}
+        used = {charger_id for _, charger_id in decisions.dispatch}
+
+        if snapshot.open_slots is None:
+            spare = len(snapshot.robots)
+        else:
+            spare = (sum(1 for robot in snapshot.robots if robot.status == STANDBY)
+                     + sum(1 for robot in snapshot.robots if robot.status == CHARGING
+                           and robot.battery >= self.release_level and not self.needs_charging(robot)))
+
+        early = []
+        for model in sorted({charger.model for charger in snapshot.chargers}):
+            if len(early) >= spare:
+                break
+            working = [
+                (robot.robot_id, robot.battery, robot.drain_rate) for robot in snapshot.robots
+                if robot.model == model and robot.status == OPERATIONAL and robot.drain_rate is not None
+                and robot.robot_id not in dispatched
+            ]
+            free_times = []
+            for charger in snapshot.chargers:
+                if charger.model != model or charger.charger_id in used:
+                    continue
+                if charger.robot_id is None:
+                    free_times.append(0.0)
+                else:
+                    free_times.append(self.horizon if charger.free_in is None else charger.free_in)
+            planned = plan_early_dispatch(working, free_times, self.charge_rate, self.threshold,
+                                          self.horizon, self.max_battery)
+            early.extend(planned[:spare - len(early)])
+        if not early:
+            return decisions
+
+        robots = {robot.robot_id: robot for robot in snapshot.robots}
+        free_chargers = [charger for charger in snapshot.chargers
+                         if charger.robot_id is None and charger.charger_id not in used]
+        early_dispatch = self.assign([robots[robot_id] for robot_id in early], free_chargers, snapshot)
+        return Decisions(decisions.dispatch + tuple(early_dispatch.items()), decisions.release)
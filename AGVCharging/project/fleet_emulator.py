@@ -0,0 +1,304 @@
+import argparse
+import logging
+import math
+import random
+import socket
+import time
+from collections import deque
+
+from battery_conversion import BATTERY_CALIBRATION
+from fleet_protocol import FleetMessageDecoder
+from soc_estimator import BATTERY_CAPACITY_AH
+
+HOST = "127.0.0.1"  # Address of the charging server
+PORT = 13000
+RECV_SIZE = 65536
+TICK_SECONDS = 0.05  # Wall time between two simulation steps
+
+# Same stations as charger_configurations in Final_version.py: charger ID -> (x, y)
+CHARGER_POSITIONS = {
+    11: (-15.262, 0.853),
+    12: (-14.215, 0.830),
+    13: (-0.162, 1.525),
+    14: (-8.677, -0.988),
+    17: (-0.504, -0.949),
+    18: (-0.276, 0.067),
+}
+FIRST_ROBOT_ID = 20
+HALL_AREA = ((-16.0, 1.0), (-2.0, 5.0))  # (x range, y range) the emulated Robotinos work in
+
+SPEED = 0.5  # Driving speed in m/s
+DOCKING_SECONDS = 20.0  # Duration of the docking manoeuvre
+DOCKING_RADIUS = 0.2  # Docking fails if no charger is closer than this (meters)
+DRAIN_RATE = (30.0, 36.0)  # Battery drain in percent per hour while working or driving, drawn per Robotino
+CHARGE_RATE = 60.0  # Battery charge in percent per hour while docked
+INITIAL_BATTERY = (20.0, 100.0)  # Range of the battery levels at start
+
+# Job states reported back to the server
+JOB_RUNNING = "RUNNING"
+JOB_FINISHED = "FINISHED"
+JOB_FAILED = "FAILED"
+
+
+def model_for(index):
+    """
+    Returns the Robotino model of the n-th emulated Robotino, the same mix as robotino_configurations
+    (four version 3 followed by two version 4).
+    """
+    return 4 if index % 6 >= 4 else 3
+
+
+class SimulatedClock:
+    """
+    Clock running `speedup` times faster than the wall clock; returns simulated seconds since start.
+    """
+
+    def __init__(self, speedup=1.0):
+        self.speedup = speedup
+        self.started = time.monotonic()
+
+    def now(self):
+        return (time.monotonic() - self.started) * self.speedup
+
+
+class EmulatedRobot:
+    """
+    State of a single emulated Robotino as reported in the FleetState.
+    """
+    __slots__ = ("robot_id", "model", "x", "y", "phi", "battery", "drain_rate", "charging", "docked",
+                 "state", "ipaddress", "jobs", "job", "target", "job_remaining")
+
+    def __init__(self, robot_id, model, x, y, battery, drain_rate):
+        self.robot_id = robot_id
+        self.model = model
+        self.x = x
+        self.y = y
+        self.phi = 0.0
+        self.battery = battery  # Percent
+        self.drain_rate = drain_rate  # Percent per hour while working or driving
+        self.charging = False
+        self.docked = False
+        self.state = "IDLE"
+        self.ipaddress = f"172.21.{robot_id % 256}.90"
+        self.jobs = deque()  # Pending (job ID, kind, target) in the order they were pushed
+        self.job = None  # (job ID, kind, target) being executed
+        self.target = None  # (x, y) while driving
+        self.job_remaining = 0.0  # Simulated seconds left for a timed job (docking)
+
+    def voltage(self):
+        limits = BATTERY_CALIBRATION[self.model]
+        return limits["min_voltage"] + self.battery / 100 * (limits["max_voltage"] - limits["min_voltage"])
+
+    def current(self):
+        """
+        Battery current in amperes: the charge current while charging, the discharge current otherwise.
+        """
+        rate = CHARGE_RATE if self.charging else self.drain_rate
+        if self.docked and not self.charging:
+            return 0.0
+        return rate / 100 * BATTERY_CAPACITY_AH[self.model]
+
+    def fleet_state_entry(self):
+        return (
+            f"robotinoid:{self.robot_id} x:{self.x:.3f} y:{self.y:.3f} phi:{self.phi:.2f} state:{self.state} "
+            f"ipaddress:{self.ipaddress} batteryvoltage:{self.voltage():.2f} current:{self.current():.2f} "
+            f"charging:{int(self.charging)} laserwarning:0 lasersafety:0 emergency:0 boxpresent:0"
+        )
+
+
+class FleetEmulator:
+    """
+    Emulates the Robotino fleet manager for load tests of the charging server.
+    Connects to the server, answers GetFleetState with the state of the emulated Robotinos and executes
+    PushJob GotoPosition (to a charger ID or x y) and BatteryChargerDocking jobs one after the other per
+    Robotino. Job progress is reported as "JobFeedback <job ID> robotinoid:<ID> state:<state>" lines.
+    Robotinos without a job work in place and drain their battery; docked Robotinos charge and return
+    to work on their own when full. The simulated clock can run faster than real time.
+    """
+
+    def __init__(self, robot_count=6, speedup=1.0, seed=0, charger_positions=CHARGER_POSITIONS):
+        self.rng = random.Random(seed)
+        self.clock = SimulatedClock(speedup)
+        self.charger_positions = charger_positions
+        (x_min, x_max), (y_min, y_max) = HALL_AREA
+        self.robots = {}
+        for index in range(robot_count):
+            robot_id = FIRST_ROBOT_ID + index
+            self.robots[robot_id] = EmulatedRobot(
+                robot_id, model_for(index),
+                self.rng.uniform(x_min, x_max), self.rng.uniform(y_min, y_max),
+                self.rng.uniform(*INITIAL_BATTERY), self.rng.uniform(*DRAIN_RATE)
+            )
+        self.last_step = self.clock.now()
+        self.outbox = []
+        self.decoder = FleetMessageDecoder(
+            handlers={"GetFleetState": self.handle_get_fleet_state, "PushJob": self.handle_push_job},
+            default_handler=lambda message: logging.debug("Emulator ignores message: %s", message)
+        )
+        self.statistics = {"fleet_state_requests": 0, "jobs_received": 0, "jobs_finished": 0, "jobs_failed": 0}
+
+    # Protocol
+    def fleet_state_message(self):
+        return "FleetState " + " , ".join(robot.fleet_state_entry() for robot in self.robots.values()) + "\n"
+
+    def handle_get_fleet_state(self, message):
+        self.step()
+        self.statistics["fleet_state_requests"] += 1
+        self.outbox.append(self.fleet_state_message())
+
+    def handle_push_job(self, message):
+        """
+        Queues a job: "PushJob GotoPosition <job> <prio> <robot> <charger ID | x y>" or
+        "PushJob BatteryChargerDocking <job> <prio> <robot> DOCK".
+        """
+        parts = message.split()
+        self.statistics["jobs_received"] += 1
+        try:
+            kind, job_id, robot_id = parts[1], int(parts[2]), int(parts[4])
+            if kind == "GotoPosition":
+                if len(parts) == 6:
+                    target = self.charger_positions[int(parts[5])]
+                else:
+                    target = (float(parts[5]), float(parts[6]))
+            elif kind == "BatteryChargerDocking":
+                target = None
+            else:
+                raise ValueError(f"unknown job type {kind}")
+            robot = self.robots[robot_id]
+        except (IndexError, KeyError, ValueError) as e:
+            logging.error("Rejecting job %r: %s", message, e)
+            job_id = parts[2] if len(parts) > 2 else "?"
+            robot_id = parts[4] if len(parts) > 4 else "?"
+            self.report(job_id, robot_id, JOB_FAILED)
+            return
+        robot.jobs.append((job_id, kind, target))
+        if robot.job is None:
+            self.start_next_job(robot)
+
+    def report(self, job_id, robot_id, state):
+        if state == JOB_FINISHED:
+            self.statistics["jobs_finished"] += 1
+        elif state == JOB_FAILED:
+            self.statistics["jobs_failed"] += 1
+        self.outbox.append(f"JobFeedback {job_id} robotinoid:{robot_id} state:{state}\n")
+
+    # Robot behaviour
+    def start_next_job(self, robot):
+        if not robot.jobs:
+            robot.job = None
+            robot.state = "IDLE"
+            return
+        robot.job = job_id, kind, target = robot.jobs.popleft()
+        robot.docked = robot.charging = False
+        if kind == "GotoPosition":
+            robot.target = target
+            robot.state = "DRIVING"
+        elif not self.at_charger(robot):
+            self.report(job_id, robot.robot_id, JOB_FAILED)
+            self.start_next_job(robot)
+            return
+        else:
+            robot.job_remaining = DOCKING_SECONDS
+            robot.state = "DOCKING"
+        self.report(job_id, robot.robot_id, JOB_RUNNING)
+
+    def at_charger(self, robot):
+        return any(math.hypot(x - robot.x, y - robot.y) <= DOCKING_RADIUS for x, y in self.charger_positions.values())
+
+    def finish_job(self, robot):
+        job_id, kind, _ = robot.job
+        robot.target = None
+        if kind == "BatteryChargerDocking":
+            robot.docked = robot.charging = True
+        self.report(job_id, robot.robot_id, JOB_FINISHED)
+        self.start_next_job(robot)
+        if robot.job is None and robot.docked:
+            robot.state = "CHARGING"
+
+    def step(self):
+        """
+        Advances all Robotinos to the current simulated time.
+        """
+        now = self.clock.now()
+        elapsed = now - self.last_step
+        self.last_step = now
+        if elapsed <= 0:
+            return
+        hours = elapsed / 3600
+        for robot in self.robots.values():
+            if robot.charging:
+                robot.battery = min(100.0, robot.battery + CHARGE_RATE * hours)
+                if robot.battery >= 100.0:
+                    robot.charging = robot.docked = False  # Undocks and returns to work
+                    robot.state = "IDLE"
+                continue
+            if not robot.docked:
+                robot.battery = max(0.0, robot.battery - robot.drain_rate * hours)
+
+            if robot.target is not None:
+                dx, dy = robot.target[0] - robot.x, robot.target[1] - robot.y
+                distance = math.hypot(dx, dy)
+                travel = SPEED * elapsed
+                if travel >= distance:
+                    robot.x, robot.y = robot.target
+                    self.finish_job(robot)
+                else:
+                    robot.x += dx / distance * travel
+                    robot.y += dy / distance * travel
+                    robot.phi = math.degrees(math.atan2(dy, dx))
+            elif robot.job is not None:
+                robot.job_remaining -= elapsed
+                if robot.job_remaining <= 0:
+                    self.finish_job(robot)
+
+    # Connection
+    def flush(self, conn):
+        if self.outbox:
+            conn.sendall("".join(self.outbox).encode("utf-8"))
+            self.outbox.clear()
+
+    def run(self, host=HOST, port=PORT, duration=None):
+        """
+        Connects to the charging server and serves it until the connection closes or `duration`
+        wall-clock seconds have passed.
+        """
+        deadline = None if duration is None else time.monotonic() + duration
+        with socket.create_connection((host, port)) as conn:
+            conn.settimeout(TICK_SECONDS)
+            print(f"Emulating {len(self.robots)} Robotinos for {host}:{port} "
+                  f"at {self.clock.speedup:g}x real time")
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    data = conn.recv(RECV_SIZE)
+                    if not data:
+                        print("Connection closed by the server")
+                        break
+                    self.decoder.feed(data)
+                except socket.timeout:
+                    pass
+                self.step()
+                self.flush(conn)
+        return self.statistics
+
+
+def main():
+    """
+    Starts the emulator against a running charging server.
+    """
+    parser = argparse.ArgumentParser(description="Emulates the Robotino fleet manager (SmartFleetCom over TCP)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--robots", type=int, default=6)
+    parser.add_argument("--speedup", type=float, default=1.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=None, help="wall-clock seconds to run, default forever")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    emulator = FleetEmulator(robot_count=args.robots, speedup=args.speedup, seed=args.seed)
+    for key, value in emulator.run(args.host, args.port, args.duration).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
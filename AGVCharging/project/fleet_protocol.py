@@ -0,0 +1,224 @@
+import logging
+import threading
+
+MESSAGE_TERMINATOR = b"\n"  # Every SmartFleetCom message ends with a newline
+MAX_FRAME_SIZE = 1024 * 1024  # Upper bound for a single message before the buffer is discarded
+
+
+class FleetMessageDecoder:
+    """
+    Incremental decoder for the newline framed messages of the SmartFleetCom protocol.
+    Bytes received from the socket are appended to a persistent buffer, complete frames
+    are split off at the message terminator and routed to the handler registered for
+    their message type (the first word of the frame, e.g. "FleetState").
+    Partial frames stay in the buffer until the rest arrives with a later read.
+    """
+
+    def __init__(self, handlers=None, default_handler=None, max_frame_size=MAX_FRAME_SIZE):
+        """
+        :param handlers: dictionary mapping a message type to a callable taking the decoded frame
+        :param default_handler: callable for frames without a registered handler (optional)
+        :param max_frame_size: number of bytes after which an unterminated frame is dropped
+        """
+        self.buffer = bytearray()
+        self.handlers = dict(handlers or {})
+        self.default_handler = default_handler
+        self.max_frame_size = max_frame_size
+        self._scan_offset = 0  # Bytes of the buffer already searched for a terminator
+
+    def register_handler(self, message_type, handler):
+        """
+        Registers the handler that is called for every frame of the given message type.
+        """
+        self.handlers[message_type] = handler
+
+    def feed(self, data):
+        """
+        Appends received bytes to the buffer and dispatches every complete frame.
+        :param data: bytes as returned by socket.recv
+        :return: number of frames dispatched
+        """
+        self.buffer += data
+        dispatched = 0
+        start = 0
+
+        while True:
+            end = self.buffer.find(MESSAGE_TERMINATOR, max(start, self._scan_offset))
+            if end == -1:
+                break
+            frame = self.buffer[start:end]
+            start = end + len(MESSAGE_TERMINATOR)
+            self._scan_offset = start
+            if self.dispatch(frame):
+                dispatched += 1
+
+        if start:
+            del self.buffer[:start]
+        self._scan_offset = len(self.buffer)
+
+        if len(self.buffer) > self.max_frame_size:
+            logging.error("dropping %d buffered bytes. Cause: no message terminator within %d bytes.",
+                          len(self.buffer), self.max_frame_size)
+            self.buffer.clear()
+            self._scan_offset = 0
+        return dispatched
+
+    def dispatch(self, frame):
+        """
+        Decodes a single frame and passes it to the handler of its message type.
+        Empty frames (e.g. from "\\r\\n" keep-alives) are ignored.
+        Handler errors are logged and the frame counts as not dispatched.
+        :return: True if the frame was handled successfully
+        """
+        try:
+            message = frame.decode('utf-8').strip()
+        except UnicodeDecodeError as e:
+            logging.error("discarding undecodable message: %s", e)
+            return False
+        if not message:
+            return False
+
+        message_type = message.split(" ", 1)[0]
+        handler = self.handlers.get(message_type, self.default_handler)
+        if handler is None:
+            logging.warning("no handler for message type %s.", message_type)
+            return False
+        try:
+            handler(message)
+        except Exception:
+            # A failing handler must not stop the remaining frames of the read or corrupt the buffer state
+            logging.exception("handler for message type %s failed", message_type)
+            return False
+        return True
+
+    def reset(self):
+        """
+        Drops all buffered bytes, e.g. after the connection was re-established.
+        """
+        self.buffer.clear()
+        self._scan_offset = 0
+
+
+class RobotRecord:
+    """
+    Per-robot state as reported in the FleetState message.
+    Records are created once per robot and updated in place on every FleetState reply.
+    """
+    __slots__ = ("robot_id", "x", "y", "phi", "current", "battery_voltage", "battery_state",
+                 "charging", "laserwarning", "lasersafety", "emergency", "boxpresent",
+                 "state", "ipaddress")
+
+    def __init__(self, robot_id):
+        self.robot_id = robot_id
+        self.x = 0.0
+        self.y = 0.0
+        self.phi = 0.0
+        self.current = 0.0
+        self.battery_voltage = None
+        self.battery_state = None  # Battery percentage, derived from battery_voltage
+        self.charging = False
+        self.laserwarning = False
+        self.lasersafety = False
+        self.emergency = False
+        self.boxpresent = False
+        self.state = None
+        self.ipaddress = None
+
+    def __repr__(self):
+        return (f"RobotRecord(robot_id={self.robot_id}, x={self.x}, y={self.y}, "
+                f"battery_state={self.battery_state}, charging={self.charging}, state={self.state})")
+
+
+def _parse_flag(value):
+    return value != "0"
+
+
+# FleetState key -> (RobotRecord attribute, converter)
+FLEET_STATE_SCHEMA = {
+    "x": ("x", float),
+    "y": ("y", float),
+    "phi": ("phi", float),
+    "current": ("current", float),
+    "batteryvoltage": ("battery_voltage", float),
+    "charging": ("charging", _parse_flag),
+    "laserwarning": ("laserwarning", _parse_flag),
+    "lasersafety": ("lasersafety", _parse_flag),
+    "emergency": ("emergency", _parse_flag),
+    "boxpresent": ("boxpresent", _parse_flag),
+    "state": ("state", str),
+    "ipaddress": ("ipaddress", str),
+}
+
+
+class FleetStateParser:
+    """
+    Schema driven parser for FleetState messages of the form
+    "FleetState robotinoid:20 x:1.0 y:2.0 ... , robotinoid:21 x:... ".
+    The field schema is compiled once; parsing walks the tokens of the message in a
+    single pass and writes the converted values straight into the robot records.
+    """
+
+    def __init__(self, schema=FLEET_STATE_SCHEMA, id_key="robotinoid"):
+        self.id_key = id_key
+        self.fields = {key: (attribute, converter) for key, (attribute, converter) in schema.items()}
+
+    def parse(self, data, records):
+        """
+        Parses a FleetState message and updates the records of all robots in it.
+        Unknown keys are ignored, records of robots seen for the first time are created.
+        :param data: decoded FleetState message
+        :param records: dictionary robot_id -> RobotRecord, updated in place
+        :return: list of robot IDs that were updated
+        """
+        fields = self.fields
+        id_key = self.id_key
+        updated = []
+        record = None
+
+        for token in data.split():
+            key, _, value = token.partition(":")
+            field = fields.get(key)
+            if field is not None:
+                if record is not None:
+                    setattr(record, field[0], field[1](value))
+            elif key == id_key:
+                robot_id = int(value)
+                record = records.get(robot_id)
+                if record is None:
+                    record = records[robot_id] = RobotRecord(robot_id)
+                updated.append(robot_id)
+            elif token == ",":
+                record = None
+        return updated
+
+
+class CommandQueue:
+    """
+    Collects outbound PushJob commands so that all commands of one decision cycle
+    (e.g. the GotoPosition + BatteryChargerDocking pair of several Robotinos) are sent with a single write.
+    The Robotinos execute their jobs in order, so no pause between the commands is needed.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def put(self, *commands):
+        """
+        Appends newline terminated commands to the queue.
+        """
+        with self.lock:
+            self.commands.extend(commands)
+
+    def flush(self, send):
+        """
+        Sends all queued commands at once.
+        :param send: callable taking the encoded payload, e.g. socket.sendall
+        :return: number of commands sent
+        """
+        with self.lock:
+            commands = self.commands
+            self.commands = []
+        if commands:
+            send("".join(commands).encode('utf-8'))
+        return len(commands)
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import math
+import os
+
+import numpy as np
+
+FLOOR_GRAPH_CACHE = "floor_graph.npz"
+GRID_RESOLUTION = 0.25  # Cell size in meters of the nearest-node lookup grid
+GRID_MARGIN = 2.0  # The lookup grid extends this far beyond the outermost nodes
+
+# CP-F-RASS stations, same locations as in "Battery monitoring/Robotino control and visualization.py"
+STATIONS = {
+    1: (-12.313, 4.249),
+    2: (-9.824, 4.267),
+    3: (-7.398, 4.286),
+}
+
+# Aisle waypoints of the IoT Factory. The module line between the upper aisle (stations) and the lower
+# aisle (chargers 11, 12, 14) can only be passed at its west and east ends.
+# Assumed layout: replace with the measured aisles when the floor plan changes.
+WAYPOINTS = {
+    "U1": (-15.0, 3.2), "U2": (-12.3, 3.2), "U3": (-9.8, 3.2), "U4": (-7.4, 3.2), "U5": (-4.5, 3.2), "U6": (-1.2, 3.2),
+    "L1": (-15.0, 0.0), "L2": (-12.0, 0.0), "L3": (-8.7, 0.0), "L4": (-4.5, 0.0), "L5": (-1.2, 0.0),
+}
+
+# Drivable straight connections; the length of an edge is the distance between its nodes
+FLOOR_EDGES = [
+    ("waypoint:U1", "waypoint:U2"), ("waypoint:U2", "waypoint:U3"), ("waypoint:U3", "waypoint:U4"),
+    ("waypoint:U4", "waypoint:U5"), ("waypoint:U5", "waypoint:U6"),
+    ("waypoint:L1", "waypoint:L2"), ("waypoint:L2", "waypoint:L3"), ("waypoint:L3", "waypoint:L4"),
+    ("waypoint:L4", "waypoint:L5"),
+    ("waypoint:U1", "waypoint:L1"), ("waypoint:U6", "waypoint:L5"),  # Passages around the module line
+    ("station:1", "waypoint:U2"), ("station:2", "waypoint:U3"), ("station:3", "waypoint:U4"),
+    ("charger:11", "waypoint:L1"), ("charger:12", "waypoint:L1"), ("charger:12", "waypoint:L2"),
+    ("charger:14", "waypoint:L3"),
+    ("charger:13", "waypoint:L5"), ("charger:13", "waypoint:U6"),
+    ("charger:17", "waypoint:L5"), ("charger:18", "waypoint:L5"),
+]
+
+
+def layout_nodes(charger_configurations, stations=STATIONS, waypoints=WAYPOINTS):
+    """
+    Collects the graph nodes of the floor layout.
+    :return: dictionary node name ("charger:11", "station:1", "waypoint:U1") -> (x, y)
+    """
+    nodes = {f"charger:{charger_id}": (config["X"], config["Y"]) for charger_id, config in charger_configurations.items()}
+    nodes.update({f"station:{station_id}": location for station_id, location in stations.items()})
+    nodes.update({f"waypoint:{name}": location for name, location in waypoints.items()})
+    return nodes
+
+
+def layout_fingerprint(nodes, edges, resolution):
+    description = json.dumps([sorted(nodes.items()), sorted(map(sorted, edges)), resolution])
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+class FloorGraph:
+    """
+    Travel distances on the factory floor.
+    Shortest path lengths between all nodes (chargers, stations, aisle waypoints) are precomputed,
+    as is the nearest node of every cell of a grid over the hall. A query for two positions is a
+    grid read for each position plus a table read, instead of a straight line through walls.
+    """
+
+    def __init__(self, names, coordinates, distances, grid_origin, resolution, grid_nodes):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.coordinates = np.asarray(coordinates, dtype=float)
+        self.distances = np.asarray(distances, dtype=float)  # All-pairs shortest path lengths
+        self.grid_origin = tuple(grid_origin)
+        self.resolution = resolution
+        self.grid_nodes = np.asarray(grid_nodes)  # Index of the nearest node per grid cell
+        self._coordinates = self.coordinates.tolist()  # Plain lists are faster for scalar reads
+        self._distances = self.distances.tolist()
+        self._grid_nodes = self.grid_nodes.tolist()
+
+    @classmethod
+    def build(cls, nodes, edges, resolution=GRID_RESOLUTION):
+        """
+        Computes the all-pairs shortest paths (Floyd-Warshall) and the nearest-node grid.
+        :param nodes: dictionary node name -> (x, y)
+        :param edges: list of (node name, node name) pairs that can be driven in a straight line
+        """
+        names = list(nodes)
+        index = {name: i for i, name in enumerate(names)}
+        coordinates = np.array([nodes[name] for name in names], dtype=float)
+
+        distances = np.full((len(names), len(names)), np.inf)
+        np.fill_diagonal(distances, 0.0)
+        for a, b in edges:
+            i, j = index[a], index[b]
+            length = float(np.hypot(*(coordinates[i] - coordinates[j])))
+            distances[i, j] = distances[j, i] = min(distances[i, j], length)
+        for k in range(len(names)):
+            np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+
+        unreachable = [names[i] for i in range(len(names)) if np.isinf(distances[i]).any()]
+        if unreachable:
+            logging.warning("floor graph is not connected, unreachable pairs involve %s", unreachable)
+
+        grid_origin = coordinates.min(axis=0) - GRID_MARGIN
+        shape = np.ceil((coordinates.max(axis=0) + GRID_MARGIN - grid_origin) / resolution).astype(int) + 1
+        cell_x = grid_origin[0] + (np.arange(shape[0]) + 0.5) * resolution
+        cell_y = grid_origin[1] + (np.arange(shape[1]) + 0.5) * resolution
+        squared = ((cell_x[:, None, None] - coordinates[None, None, :, 0]) ** 2
+                   + (cell_y[None, :, None] - coordinates[None, None, :, 1]) ** 2)
+        grid_nodes = squared.argmin(axis=2).astype(np.int32)
+        return cls(names, coordinates, distances, grid_origin, resolution, grid_nodes)
+
+    @classmethod
+    def load_or_build(cls, nodes, edges, path=FLOOR_GRAPH_CACHE, resolution=GRID_RESOLUTION, save=True):
+        """
+        Loads the graph from the cache file if it was built for the same layout, otherwise builds it
+        and, if save is set, writes the cache file.
+        """
+        fingerprint = layout_fingerprint(nodes, edges, resolution)
+        if os.path.exists(path):
+            try:
+                with np.load(path) as cache:
+                    if str(cache["fingerprint"]) == fingerprint:
+                        return cls(cache["names"].tolist(), cache["coordinates"], cache["distances"],
+                                   cache["grid_origin"], resolution, cache["grid_nodes"])
+            except (OSError, KeyError, ValueError) as e:
+                logging.warning("rebuilding floor graph. Cause: cache %s unreadable (%s)", path, e)
+        graph = cls.build(nodes, edges, resolution)
+        if not save:
+            return graph
+        try:
+            with open(path, "wb") as f:
+                np.savez(f, fingerprint=fingerprint, names=np.array(graph.names), coordinates=graph.coordinates,
+                         distances=graph.distances, grid_origin=np.array(graph.grid_origin),
+                         grid_nodes=graph.grid_nodes)
+        except OSError as e:
+            logging.warning("floor graph cache %s not written: %s", path, e)
+        return graph
+
+    def nearest_node(self, x, y):
+        """
+        Returns the index of the node nearest to (x, y); positions outside the grid use the border cell.
+        """
+        column = int((x - self.grid_origin[0]) // self.resolution)
+        row = int((y - self.grid_origin[1]) // self.resolution)
+        column = min(max(column, 0), len(self._grid_nodes) - 1)
+        row = min(max(row, 0), len(self._grid_nodes[0]) - 1)
+        return self._grid_nodes[column][row]
+
+    def node_distance(self, a, b):
+        """
+        Returns the shortest path length between two named nodes, e.g. ("charger:11", "station:2").
+        """
+        return self._distances[self.index[a]][self.index[b]]
+
+    def travel_distance(self, x1, y1, x2, y2):
+        """
+        Travel distance between two positions: straight to the nearest node, along the shortest path,
+        straight from the node nearest to the destination. Same signature as euclidean_distance.
+        """
+        start = self.nearest_node(x1, y1)
+        end = self.nearest_node(x2, y2)
+        if start == end:
+            return math.hypot(x2 - x1, y2 - y1)
+        start_x, start_y = self._coordinates[start]
+        end_x, end_y = self._coordinates[end]
+        return (math.hypot(start_x - x1, start_y - y1) + self._distances[start][end]
+                + math.hypot(x2 - end_x, y2 - end_y))
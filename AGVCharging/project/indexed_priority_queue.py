@@ -0,0 +1,144 @@
+import itertools
+
+
+class IndexedPriorityQueue:
+    """
+    Binary heap addressable by item (e.g. a robot ID).
+    A position index per item allows changing the priority of an item (decrease/increase key)
+    and removing any item in O(log n); peek is O(1). Items with equal priority keep insertion order.
+    With reverse=True the queue is a max-view: peek/pop return the item with the highest priority
+    (e.g. the most charged Robotino).
+    """
+
+    def __init__(self, items=(), reverse=False):
+        """
+        :param items: iterable of (item, priority) pairs to start with
+        :param reverse: True to order by highest priority first
+        """
+        self.reverse = reverse
+        self.heap = []  # Entries [sort key, sequence, item]
+        self.positions = {}  # item -> index of its entry in the heap
+        self.priorities = {}  # item -> priority as given by the caller
+        self.sequence = itertools.count()
+        for item, priority in items:
+            self.push(item, priority)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        """
+        Iterates over the items in heap order (not sorted); use sorted_items() for priority order.
+        """
+        return iter([entry[2] for entry in self.heap])
+
+    def __repr__(self):
+        return f"IndexedPriorityQueue({self.sorted_items()})"
+
+    def _key(self, priority):
+        return -priority if self.reverse else priority
+
+    def push(self, item, priority):
+        """
+        Adds an item or changes the priority of an item that is already queued.
+        """
+        if item in self.positions:
+            self.update(item, priority)
+            return
+        self.priorities[item] = priority
+        self.heap.append([self._key(priority), next(self.sequence), item])
+        self.positions[item] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def update(self, item, priority):
+        """
+        Changes the priority of a queued item in O(log n).
+        """
+        index = self.positions[item]
+        entry = self.heap[index]
+        old_key = entry[0]
+        entry[0] = self._key(priority)
+        self.priorities[item] = priority
+        if entry[0] < old_key:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, item):
+        """
+        Removes an item in O(log n).
+        :raises KeyError: if the item is not queued
+        """
+        index = self.positions.pop(item)
+        del self.priorities[item]
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.positions[last[2]] = index
+            self._sift_up(index)
+            self._sift_down(self.positions[last[2]])
+
+    def discard(self, item):
+        """
+        Removes an item if it is queued.
+        """
+        if item in self.positions:
+            self.remove(item)
+
+    def peek(self):
+        """
+        Returns (item, priority) of the first item without removing it.
+        """
+        item = self.heap[0][2]
+        return item, self.priorities[item]
+
+    def pop(self):
+        """
+        Removes and returns (item, priority) of the first item.
+        """
+        item, priority = self.peek()
+        self.remove(item)
+        return item, priority
+
+    def priority(self, item):
+        return self.priorities[item]
+
+    def sorted_items(self):
+        """
+        Returns all items in priority order.
+        """
+        return [entry[2] for entry in sorted(self.heap)]
+
+    def _sift_up(self, index):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[parent][:2] <= entry[:2]:
+                break
+            heap[index] = heap[parent]
+            self.positions[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        self.positions[entry[2]] = index
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][:2] < heap[child][:2]:
+                child += 1
+            if entry[:2] <= heap[child][:2]:
+                break
+            heap[index] = heap[child]
+            self.positions[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        self.positions[entry[2]] = index
@@ -0,0 +1,90 @@
+import math
+
+from battery_conversion import voltage_to_percentage
+
+# Nominal battery capacity in ampere hours per Robotino model (assumed from the data sheets, adjust per fleet)
+BATTERY_CAPACITY_AH = {
+    3: 4.0,  # 2 x 12 V lead-gel batteries in series
+    4: 8.0,
+}
+VOLTAGE_CORRECTION_GAIN = 0.05  # Share of the voltage based estimate blended in per update while driving
+REST_CURRENT = 0.3  # Amperes below which the battery voltage is close to the open circuit voltage
+REST_CORRECTION_GAIN = 0.3  # Blend share of the voltage based estimate while (almost) resting
+CURRENT_SMOOTHING = 0.1  # Weight of the newest current sample in the average discharge current
+
+
+class SocState:
+    """
+    State of charge estimate of a single Robotino.
+    """
+    __slots__ = ("soc", "average_current", "last_update")
+
+    def __init__(self, soc, last_update):
+        self.soc = soc  # 0..1
+        self.average_current = None  # Smoothed discharge current in amperes
+        self.last_update = last_update
+
+
+class SocEstimator:
+    """
+    Estimates the state of charge of every Robotino by coulomb counting with the current reported in the
+    FleetState, corrected towards the voltage based percentage. The correction is weak while the Robotino
+    draws current (the voltage sags under load) and strong while it rests.
+    The smoothed discharge current gives the remaining runtime.
+    The reported current is taken as the discharge current, or as the charge current while charging.
+    """
+
+    def __init__(self, capacities=BATTERY_CAPACITY_AH):
+        self.capacities = capacities
+        self.states = {}
+
+    def update(self, robot_id, model, voltage, current, charging, timestamp):
+        """
+        Adds a new measurement of a Robotino.
+        :param model: Robotino model number (3 or 4)
+        :param voltage: battery voltage in Volts
+        :param current: current in amperes
+        :param charging: True while the Robotino is docked and charging
+        :param timestamp: measurement time in seconds (monotonic clock)
+        :return: the updated SocState
+        """
+        voltage_soc = voltage_to_percentage(voltage, model) / 100
+        state = self.states.get(robot_id)
+        if state is None:
+            state = self.states[robot_id] = SocState(voltage_soc, timestamp)
+            return state
+
+        elapsed_hours = max(0.0, timestamp - state.last_update) / 3600
+        state.last_update = timestamp
+        charge_ah = current * elapsed_hours
+        state.soc += (charge_ah if charging else -charge_ah) / self.capacities[model]
+
+        if not charging:
+            if state.average_current is None:
+                state.average_current = current
+            else:
+                state.average_current += CURRENT_SMOOTHING * (current - state.average_current)
+
+        gain = REST_CORRECTION_GAIN if abs(current) < REST_CURRENT else VOLTAGE_CORRECTION_GAIN
+        state.soc += gain * (voltage_soc - state.soc)
+        state.soc = min(1.0, max(0.0, state.soc))
+        return state
+
+    def state_of_charge(self, robot_id):
+        """
+        Returns the estimated state of charge in percent or None if the Robotino has no estimate yet.
+        """
+        state = self.states.get(robot_id)
+        return None if state is None else state.soc * 100
+
+    def remaining_runtime(self, robot_id, model):
+        """
+        Predicts the seconds until the battery is empty at the smoothed discharge current.
+        :return: seconds, math.inf if the Robotino draws no current, None without an estimate
+        """
+        state = self.states.get(robot_id)
+        if state is None or state.average_current is None:
+            return None
+        if state.average_current <= 0:
+            return math.inf
+        return state.soc * self.capacities[model] / state.average_current * 3600
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+import time
+
+STATE_DIRECTORY = "charging_state"
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "jobs.journal"
+SNAPSHOT_INTERVAL = 30  # Seconds between two snapshots while the scheduler state does not change
+SNAPSHOT_VERSION = 1
+
+# Journal entry kinds besides the PushJob types
+ABORT = "abort"  # The commands of a dispatch were never sent, the lease taken for it is void
+
+
+class StateStore:
+    """
+    Persists the scheduler state of the charging server for a warm restart.
+    A snapshot of the whole state is written atomically (temporary file, fsync, rename) into
+    <directory>/snapshot.json. Issued jobs are recorded in memory once their commands are queued and
+    written to a write-ahead journal (<directory>/jobs.journal, one JSON object per line) by sync(),
+    which the server calls before the commands are sent. A dispatch whose commands could not be sent
+    gets an abort record, so a restart does not restore its lease. Each snapshot names the sequence
+    number of the last journal entry it contains; the journal is then rewritten with the newer entries only.
+    """
+
+    def __init__(self, directory=STATE_DIRECTORY, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.lock = threading.Lock()
+        self.sequence = 0  # Sequence number of the last recorded journal entry
+        self.pending = []  # Recorded entries not written yet
+        self.written = []  # Written entries not covered by the snapshot yet
+        self.last_snapshot = None  # time.monotonic() of the last snapshot
+        self.journal = None
+
+    def _open_journal(self):
+        if self.journal is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def load(self):
+        """
+        Reads the last snapshot and the journal entries written after it.
+        Entries of a torn last line (crash during the write) are skipped.
+        :return: (snapshot dictionary or None, list of journal entries in order)
+        """
+        snapshot = None
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                logging.warning("ignoring snapshot %s of version %s", self.snapshot_path, snapshot.get("version"))
+                snapshot = None
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("ignoring unreadable snapshot %s: %s", self.snapshot_path, e)
+            snapshot = None
+
+        first_sequence = snapshot["journal_sequence"] + 1 if snapshot is not None else 0
+        entries = []
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.warning("skipping torn journal entry in %s", self.journal_path)
+                        continue
+                    if entry["sequence"] >= first_sequence:
+                        entries.append(entry)
+        except FileNotFoundError:
+            pass
+
+        with self.lock:
+            self.sequence = max([first_sequence - 1] + [entry["sequence"] for entry in entries])
+            self.written = list(entries)
+        return snapshot, entries
+
+    def _record(self, entry):
+        with self.lock:
+            self.sequence += 1
+            entry = dict(entry, sequence=self.sequence, time=time.time())
+            self.pending.append(entry)
+            return entry
+
+    def record_job(self, job_id, kind, robot_id, charger_id=None):
+        """
+        Records a job whose command was queued for sending; written to the journal by the next sync().
+        """
+        return self._record({"job_id": job_id, "kind": kind, "robot_id": robot_id, "charger_id": charger_id})
+
+    def record_abort(self, robot_id, charger_id):
+        """
+        Records that the dispatch of a Robotino to a charger was not sent.
+        """
+        return self._record({"kind": ABORT, "robot_id": robot_id, "charger_id": charger_id})
+
+    def sync(self):
+        """
+        Writes all recorded entries to the journal and syncs it to disk. Call before the commands are sent.
+        :return: list of the entries written
+        """
+        with self.lock:
+            if not self.pending:
+                return []
+            entries, self.pending = self.pending, []
+            self._open_journal()
+            self.journal.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.written.extend(entries)
+            return entries
+
+    def snapshot_due(self):
+        return self.last_snapshot is None or time.monotonic() - self.last_snapshot >= self.snapshot_interval
+
+    def save_snapshot(self, state):
+        """
+        Atomically replaces the snapshot with the given state and drops the journal entries it covers.
+        :param state: JSON serializable dictionary of the scheduler state, with "journal_sequence" set to
+                      the sequence number of the last entry recorded when the state was collected
+        """
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            snapshot = dict(state, version=SNAPSHOT_VERSION, saved_at=time.time())
+            self._replace(self.snapshot_path, json.dumps(snapshot, separators=(",", ":")))
+            # Entries recorded after the state was collected stay in the journal
+            self.written = [entry for entry in self.written if entry["sequence"] > state["journal_sequence"]]
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            self._replace(self.journal_path,
+                          "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in self.written))
+            self.last_snapshot = time.monotonic()
+
+    @staticmethod
+    def _replace(path, content):
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+    def close(self):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
@@ -0,0 +1,138 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+LOG_FILE = "charging_selection.log"
+MAX_LOG_BYTES = 5 * 1024 * 1024  # Size after which the log file is rotated
+BACKUP_COUNT = 5  # Rotated log files that are kept
+RATE_LIMIT_INTERVAL = 30.0  # Seconds in which an identical message is logged only once
+RATE_LIMIT_KEYS = 1024  # Distinct messages the rate limit remembers at most
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s"
+
+# Attributes every LogRecord has; everything else was passed with extra= and is written as a JSON field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line: time, level, thread, logger and message,
+    plus every field given with extra= (e.g. extra={"event": "charger_assigned", "robot_id": 20}).
+    """
+
+    def format(self, record):
+        event = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                event[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event["exception"] = record.exc_text
+        return json.dumps(event, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets an identical message (same template and arguments) through at most once per interval.
+    The number of dropped repetitions is attached to the next record that passes as `suppressed`.
+    Records carrying an `event` field (charging decisions, jobs) are never dropped.
+    Messages last emitted more than an interval ago are forgotten, and at most max_keys are remembered,
+    so messages with changing arguments (e.g. battery voltages) do not grow the table.
+    """
+
+    def __init__(self, interval=RATE_LIMIT_INTERVAL, max_keys=RATE_LIMIT_KEYS):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        # (level, template, arguments) -> (time, repetitions dropped since), oldest emission first
+        self.last_emitted = OrderedDict()
+
+    def filter(self, record):
+        if hasattr(record, "event"):
+            return True
+        try:
+            key = (record.levelno, record.msg, record.args)
+            hash(key)
+        except TypeError:
+            return True  # Unhashable arguments are never rate limited
+        now = time.monotonic()
+        with self.lock:
+            last = self.last_emitted.get(key)
+            if last is not None and now - last[0] < self.interval:
+                self.last_emitted[key] = (last[0], last[1] + 1)
+                return False
+            self.last_emitted[key] = (now, 0)
+            self.last_emitted.move_to_end(key)
+            while self.last_emitted:
+                oldest = next(iter(self.last_emitted.values()))
+                if now - oldest[0] < self.interval and len(self.last_emitted) <= self.max_keys:
+                    break
+                self.last_emitted.popitem(last=False)
+        if last is not None and last[1]:
+            record.suppressed = last[1]
+        return True
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the message formatting to the listener thread.
+    The standard QueueHandler formats every record in the logging thread before queueing it;
+    here only the traceback is rendered (it cannot outlive the exception), so arguments passed to
+    the logging call must not be changed afterwards.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level=logging.INFO, log_file=LOG_FILE, console=True,
+                  max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT, rate_limit_interval=RATE_LIMIT_INTERVAL):
+    """
+    Configures the root logger: logging calls only put the record on a queue, a QueueListener thread
+    writes JSON lines to a rotating log file and readable lines to the console.
+    :param level: level of the root logger
+    :param log_file: path of the JSON log file
+    :param console: True to also log to stderr
+    :param rate_limit_interval: seconds in which identical messages are logged only once, None to log all
+    :return: the started QueueListener (stopped automatically at exit)
+    """
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    if rate_limit_interval:
+        queue_handler.addFilter(RateLimitFilter(rate_limit_interval))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,16 @@
+import numpy as np
+
+from battery_conversion import BATTERY_CALIBRATION, voltages_to_percentages
+
+
+def test_matches_truncating_scalar_conversion():
+    for model, limits in BATTERY_CALIBRATION.items():
+        voltages = np.linspace(limits["min_voltage"], limits["max_voltage"], 1001)
+        voltage_range = limits["max_voltage"] - limits["min_voltage"]
+        expected = [int((voltage - limits["min_voltage"]) / voltage_range * 100) for voltage in voltages]
+        assert voltages_to_percentages(voltages, [model] * len(voltages)).tolist() == expected
+    assert voltages_to_percentages([20.53], [3]).tolist() == [20]
+
+
+def test_clamped_to_valid_range():
+    assert voltages_to_percentages([15.0, 26.0, 21.0], [3, 3, 4]).tolist() == [0, 100, 100]
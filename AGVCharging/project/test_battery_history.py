@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+
+from battery_history import CHUNK_SECONDS, SAMPLE_DTYPE, BatteryHistory
+
+
+def make_samples(robot_ids, timestamps):
+    return [(timestamp, robot_id, 22.0, 1.0, 0.0, 0.0, 50, 0) for timestamp in timestamps for robot_id in robot_ids]
+
+
+def test_robot_query_reads_only_its_partition(tmp_path):
+    history = BatteryHistory(str(tmp_path))
+    history.append(make_samples([20, 21, 24], [CHUNK_SECONDS - 10.0, CHUNK_SECONDS + 10.0]))
+    assert history.robots() == [20, 21, 24]
+    assert history.chunks(21) == [0, CHUNK_SECONDS]
+    assert sorted(os.listdir(tmp_path / "21")) == ["0.bin", f"{CHUNK_SECONDS}.bin"]
+
+    samples = history.query(robot_id=21, start=CHUNK_SECONDS)
+    assert samples["robot_id"].tolist() == [21]
+    assert samples["timestamp"].tolist() == [CHUNK_SECONDS + 10.0]
+
+    # The fleet query merges the Robotinos in time order
+    fleet = history.query()
+    assert fleet["timestamp"].tolist() == [CHUNK_SECONDS - 10.0] * 3 + [CHUNK_SECONDS + 10.0] * 3
+    assert fleet["robot_id"].tolist() == [20, 21, 24] * 2
+    history.close()
+
+
+def test_fleet_chunks_of_earlier_versions_are_read(tmp_path):
+    np.asarray(make_samples([20, 21], [5.0]), dtype=SAMPLE_DTYPE).tofile(str(tmp_path / "0.bin"))
+    history = BatteryHistory(str(tmp_path))
+    history.append(make_samples([21], [15.0]))
+    assert history.query(robot_id=21)["timestamp"].tolist() == [5.0, 15.0]
+    assert history.query()["robot_id"].tolist() == [20, 21, 21]
+    history.close()
@@ -0,0 +1,35 @@
+from charger_assignment import assign_chargers, assign_chargers_greedy, euclidean_distance
+
+
+def total_travel(robots, chargers, assignments):
+    robot_positions = {robot_id: (x, y) for robot_id, x, y, _, _ in robots}
+    charger_positions = {charger_id: (x, y) for charger_id, x, y, _ in chargers}
+    return sum(euclidean_distance(*robot_positions[robot_id], *charger_positions[charger_id])
+               for robot_id, charger_id in assignments.items())
+
+
+def test_matching_cuts_travel_on_contested_layout():
+    # Both Robotinos are nearest to charger 11; the first one served greedily takes it
+    # and sends the other across the hall to charger 12
+    robots = [(20, 0.0, 0.0, 15, 3), (21, 2.0, 0.0, 15, 3)]
+    chargers = [(11, 1.0, 0.0, 3), (12, -10.0, 0.0, 3)]
+
+    greedy = assign_chargers_greedy(robots, chargers)
+    matching = assign_chargers(robots, chargers)
+
+    assert greedy == {20: 11, 21: 12}
+    assert matching == {20: 12, 21: 11}
+    assert total_travel(robots, chargers, greedy) == 13.0
+    assert total_travel(robots, chargers, matching) == 11.0
+
+
+def test_every_charger_assigned_once_and_types_respected():
+    robots = [(20, 0.0, 0.0, 10, 3), (21, 0.5, 0.0, 12, 3), (22, 1.0, 0.0, 14, 3), (24, 0.0, 1.0, 10, 4)]
+    chargers = [(11, 0.0, 0.0, 3), (12, 1.0, 0.0, 3), (17, 5.0, 5.0, 4)]
+
+    assignments = assign_chargers(robots, chargers)
+
+    assert len(set(assignments.values())) == len(assignments)
+    assert assignments[24] == 17
+    # With two type 3 chargers for three Robotinos the least charged ones are served
+    assert set(assignments) == {20, 21, 24}
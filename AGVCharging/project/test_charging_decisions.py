@@ -0,0 +1,179 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from battery_history import BatteryHistory
+from fleet_emulator import EmulatedRobot
+from indexed_priority_queue import IndexedPriorityQueue
+from predictive_scheduler import DrainTracker
+from state_store import StateStore
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    The charging server module with an empty scheduler state and all Robotinos operational.
+    """
+    monkeypatch.chdir(tmp_path)
+    import Final_version as server
+    monkeypatch.setattr(server, "battery_history", BatteryHistory(str(tmp_path / "battery_history")))
+    monkeypatch.setattr(server, "state_store", StateStore(str(tmp_path / "charging_state")))
+    monkeypatch.setattr(server, "drain_tracker", DrainTracker())
+    monkeypatch.setattr(server, "operational_queue",
+                        IndexedPriorityQueue((robot_id, 100) for robot_id in server.robotino_configurations))
+    monkeypatch.setattr(server, "charging_queue", IndexedPriorityQueue(reverse=True))
+    monkeypatch.setattr(server, "waiting_robots", set())
+    server.fleet_state.clear()
+    server.robot_triggers.clear()
+    server.charger_reservations.clear()
+    server.wait_for_fleet_state_changes(timeout=0)
+    return server
+
+
+def make_robots(server, battery=90.0):
+    return {robot_id: EmulatedRobot(robot_id, config["type"], -5.0, float(robot_id - 20), battery, 30.0)
+            for robot_id, config in server.robotino_configurations.items()}
+
+
+def report(server, robots):
+    """
+    Processes a FleetState of the robots and returns the Robotinos it reported as changed.
+    """
+    server.process_fleet_state_response("FleetState " + " , ".join(robot.fleet_state_entry() for robot in robots.values()))
+    return server.wait_for_fleet_state_changes(timeout=0)
+
+
+def decide(server, changed):
+    sent = {}
+    server.evaluate_charging_decisions(changed, lambda robot_id, commands: sent.setdefault(robot_id, commands))
+    return sent
+
+
+def test_reaching_release_level_releases_charging_robot(server):
+    robots = make_robots(server)
+    robots[20].battery = 10.0
+    assert 20 in decide(server, report(server, robots))
+    charger_id = server.charger_reservations.lease_for(20).charger_id
+
+    robots[20].battery, robots[20].charging = 50.0, True
+    decide(server, report(server, robots))
+    robots[20].battery = 75.0
+    assert report(server, robots) == set()
+
+    robots[20].battery = 85.0
+    assert report(server, robots) == {20}
+    decide(server, {20})
+    assert 20 in server.operational_queue
+    assert server.charger_reservations.lease_for(20) is None
+    assert not server.charger_reservations.is_reserved(charger_id)
+
+
+def test_policy_only_considers_changed_and_waiting_robots(server, monkeypatch):
+    seen = []
+    decide_all = server.charging_policy.decide
+
+    def recording_decide(snapshot, considered=None):
+        seen.append(({robot.robot_id for robot in snapshot.robots}, set(considered)))
+        return decide_all(snapshot, considered)
+
+    monkeypatch.setattr(server.charging_policy, "decide", recording_decide)
+    robots = make_robots(server)
+    decide(server, report(server, robots))
+    assert seen[-1] == (set(server.robotino_configurations), set(server.robotino_configurations))
+
+    robots[21].x += 1.0
+    decide(server, report(server, robots))
+    assert seen[-1] == (set(server.robotino_configurations), {21})
+
+    # Both type 4 chargers taken: the third low Robotino of that type waits and is offered again without changes
+    for robot_id in (24, 25):
+        robots[robot_id].battery = 10.0
+    decide(server, report(server, robots))
+    monkeypatch.setitem(server.robotino_configurations, 26, {"type": 4})
+    robots[26] = EmulatedRobot(26, 4, -5.0, 6.0, 10.0, 30.0)
+    server.operational_queue.push(26, 100)
+    assert 26 not in decide(server, report(server, robots))
+    decide(server, set())
+    assert seen[-1][1] == {26}
+
+    # A low Robotino that is not considered is left alone
+    robots[21].battery = 10.0
+    report(server, robots)
+    assert decide(server, {22}) == {}
+
+
+def test_predictive_policy_plans_with_the_whole_fleet(server, monkeypatch):
+    monkeypatch.setattr(server, "charging_policy", server.charging_policy)
+    server.configure_charging_policy("predictive")
+    monkeypatch.setitem(server.robotino_configurations, 26, {"type": 4})
+    server.operational_queue.push(26, 100)
+    robots = make_robots(server)
+    report(server, robots)
+
+    # Three type 4 Robotinos get close to the threshold while one of the two type 4 chargers is taken
+    server.charger_reservations.reserve(18, 90)
+    for robot_id, battery in ((24, 25.0), (25, 26.0), (26, 27.0)):
+        robots[robot_id].battery = battery
+        server.drain_tracker.rates[robot_id] = 30.0
+    assert not any(server.needs_charging(robot_id) for robot_id in report(server, robots))
+
+    # Any single considered Robotino is enough for the plan to send the emptiest one early
+    assert set(decide(server, {21})) == {24}
+    assert server.charger_reservations.lease_for(24).charger_id == 17
+
+
+def test_aborted_dispatch_is_offered_again(server):
+    robots = make_robots(server)
+    robots[20].battery = 10.0
+    assert 20 in decide(server, report(server, robots))
+    server.abort_dispatches([20])
+    assert server.charger_reservations.lease_for(20) is None
+    assert 20 in server.operational_queue
+
+    # The Robotino does not move or change, it is still sent again
+    assert report(server, robots) == {20}
+    assert 20 in decide(server, set())
+    assert server.charger_reservations.lease_for(20) is not None
+
+
+def start_connection(server):
+    """
+    Serves one end of a socket pair like an accepted fleet manager connection.
+    :return: (client socket, threads of the connection)
+    """
+    conn, client = socket.socketpair()
+    closed = threading.Event()
+    threads = [threading.Thread(target=server.handle_incoming_messages, args=(conn, "test", closed), daemon=True),
+               threading.Thread(target=server.charging_management, args=(conn, closed), daemon=True)]
+    for thread in threads:
+        thread.start()
+    return client, threads
+
+
+def receive_until(client, text, timeout=5.0):
+    client.settimeout(timeout)
+    received = b""
+    deadline = time.monotonic() + timeout
+    while text.encode() not in received and time.monotonic() < deadline:
+        received += client.recv(65536)
+    return received.decode()
+
+
+def test_reconnected_fleet_manager_gets_the_dispatch(server):
+    old_client, old_threads = start_connection(server)
+    old_client.close()
+    for thread in old_threads:
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    client, threads = start_connection(server)
+    robots = make_robots(server)
+    robots[20].battery = 10.0
+    client.sendall(("FleetState " + " , ".join(robot.fleet_state_entry() for robot in robots.values()) + "\n").encode())
+    assert "PushJob GotoPosition" in receive_until(client, "BatteryChargerDocking")
+    assert server.charger_reservations.lease_for(20) is not None
+    client.close()
+    for thread in threads:
+        thread.join(timeout=2)
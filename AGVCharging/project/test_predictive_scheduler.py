@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from predictive_scheduler import DrainTracker
+
+READING_INTERVAL = 2  # Seconds between two FleetState replies
+
+
+def feed(tracker, robot_id, start, battery, drain_rate, seconds, quantize=math.floor, working=True):
+    """
+    Feeds whole-percent readings of a battery draining at drain_rate percent per hour.
+    :return: time after the last reading
+    """
+    for step in range(int(seconds / READING_INTERVAL)):
+        elapsed = step * READING_INTERVAL
+        tracker.update(robot_id, quantize(battery - drain_rate * elapsed / 3600), start + elapsed, working=working)
+    return start + seconds
+
+
+@pytest.mark.parametrize("quantize", [math.floor, round])
+@pytest.mark.parametrize("drain_rate", [30.0, 12.0])
+def test_rate_from_whole_percent_readings(drain_rate, quantize):
+    tracker = DrainTracker()
+    feed(tracker, 20, 5e5, 90.0, drain_rate, 30 * 60, quantize)
+    assert tracker.rate(20) == pytest.approx(drain_rate, rel=0.1)
+
+
+def test_no_rate_before_min_span():
+    tracker = DrainTracker()
+    feed(tracker, 20, 0.0, 90.0, 30.0, 9 * 60)
+    assert tracker.rate(20) is None
+
+
+def test_rate_stays_exact_over_long_runs():
+    tracker = DrainTracker()
+    feed(tracker, 20, 1e9, 99.0, 12.0, 8 * 60 * 60)
+    assert tracker.rate(20) == pytest.approx(12.0, rel=0.1)
+
+
+def test_charging_starts_a_new_working_period():
+    tracker = DrainTracker()
+    now = feed(tracker, 20, 0.0, 90.0, 30.0, 30 * 60)
+    now = feed(tracker, 20, now, 80.0, -60.0, 10 * 60, working=False)
+    assert tracker.rate(20) == pytest.approx(30.0, rel=0.1)
+
+    # The charge gained must not enter the fit of the next working period
+    feed(tracker, 20, now, 95.0, 12.0, 30 * 60)
+    assert tracker.rate(20) == pytest.approx(12.0, rel=0.1)
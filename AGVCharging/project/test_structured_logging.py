@@ -0,0 +1,34 @@
+import logging
+
+from structured_logging import RateLimitFilter
+
+
+def make_record(message, *args):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+
+
+def test_repetitions_are_dropped_and_counted():
+    rate_limit = RateLimitFilter(interval=60)
+    assert rate_limit.filter(make_record("voltage %s", 24.1))
+    assert not rate_limit.filter(make_record("voltage %s", 24.1))
+    assert not rate_limit.filter(make_record("voltage %s", 24.1))
+
+    # Once the interval passed, the message is emitted again with the count of the dropped repetitions
+    key = (logging.INFO, "voltage %s", (24.1,))
+    rate_limit.last_emitted[key] = (rate_limit.last_emitted[key][0] - 60, 2)
+    record = make_record("voltage %s", 24.1)
+    assert rate_limit.filter(record)
+    assert record.suppressed == 2
+
+
+def test_table_stays_bounded():
+    rate_limit = RateLimitFilter(interval=60, max_keys=100)
+    for step in range(1000):
+        assert rate_limit.filter(make_record("voltage %s", step))
+    assert len(rate_limit.last_emitted) == 100
+
+    # Expired messages are forgotten as soon as another message is checked
+    for key, (emitted, dropped) in rate_limit.last_emitted.items():
+        rate_limit.last_emitted[key] = (emitted - 60, dropped)
+    rate_limit.filter(make_record("voltage %s", "new"))
+    assert len(rate_limit.last_emitted) == 1